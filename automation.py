@@ -5,23 +5,42 @@ import webbrowser
 import pyautogui
 import subprocess
 import time
+import config
+import tracing
+from automation_backend import get_backend
 
 # NOTE: We removed 'from speech_engine import speak' from here to fix the crash.
 
+@tracing.traced("automation.open_app")
 def open_app(app_name):
-    """Opens Mac applications"""
+    """Opens applications through the persistent automation backend"""
     from speech_engine import speak  # Local import to prevent circular crash
     try:
-        os.system(f"open -a '{app_name}'")
+        if not get_backend().open_app(app_name):
+            raise RuntimeError(app_name)
         speak(f"Opening {app_name}")
     except Exception as e:
         speak(f"Could not open {app_name}")
 
+@tracing.traced("automation.set_volume")
+def set_volume(level):
+    return get_backend().set_volume(level)
+
+@tracing.traced("automation.mute")
+def mute():
+    return get_backend().set_muted(True)
+
+@tracing.traced("automation.unmute")
+def unmute():
+    return get_backend().set_muted(False)
+
+@tracing.traced("automation.search_google")
 def search_google(query):
     from speech_engine import speak
     speak(f"Searching Google for {query}")
     pywhatkit.search(query)
 
+@tracing.traced("automation.play_youtube")
 def play_youtube(video_name):
     from speech_engine import speak
     speak(f"Playing {video_name} on YouTube")
@@ -30,35 +49,63 @@ def play_youtube(video_name):
 def minimize_window():
     pyautogui.hotkey('command', 'm')
     
-def take_screenshot():
+@tracing.traced("automation.take_screenshot")
+def take_screenshot(region=None):
+    from speech_engine import speak
+    from screenshot_service import get_service
+    # Confirm from the writer thread, once the file is actually on disk
+    on_saved = lambda path, ok: speak("Screenshot saved." if ok else "I couldn't save the screenshot.")
+    if not get_service().capture(region, on_saved):
+        speak("Screenshots are still being saved.")
+
+def take_screenshot_burst(count, interval=1.0, region=None):
+    from speech_engine import speak
+    from screenshot_service import get_service
+    speak(f"Taking {count} screenshots.")
+    get_service().burst(count, interval, region)
+
+def start_screenshot_interval(interval, region=None):
+    from speech_engine import speak
+    from screenshot_service import get_service
+    speak(f"Taking a screenshot every {interval} seconds. Say stop screenshots to end.")
+    get_service().start_interval(interval, region)
+
+def stop_screenshots():
     from speech_engine import speak
-    screenshot = pyautogui.screenshot()
-    screenshot.save("screenshot.png")
-    speak("Screenshot saved.")
+    from screenshot_service import get_service
+    get_service().stop_burst()
+    speak("Stopped taking screenshots.")
 
-def shutdown_system():
+def shutdown_system(task):
     from speech_engine import speak
     speak("Initiating system shutdown. Goodbye.")
-    time.sleep(2)
+    # Grace period: "blaze cancel" still stops it until commit()
+    if not task.wait(config.SYSTEM_ACTION_GRACE_SECONDS) or not task.commit():
+        return False
     try:
         subprocess.call(['sudo', 'shutdown', '-h', 'now'])
     except:
         os.system("shutdown -h now")
+    return True
 
-def restart_system():
+def restart_system(task):
     from speech_engine import speak
     speak("Initiating system restart.")
-    time.sleep(2)
+    if not task.wait(config.SYSTEM_ACTION_GRACE_SECONDS) or not task.commit():
+        return False
     try:
         subprocess.call(['sudo', 'shutdown', '-r', 'now'])
     except:
         os.system("shutdown -r now")
+    return True
 
-def sleep_system():
+def sleep_system(task):
     from speech_engine import speak
     speak("Putting system to sleep. Good night.")
-    time.sleep(1)
+    if not task.wait(config.SYSTEM_ACTION_GRACE_SECONDS) or not task.commit():
+        return False
     try:
         os.system("pmset sleepnow")
     except:
-        speak("Unable to sleep system.")
\ No newline at end of file
+        speak("Unable to sleep system.")
+    return True
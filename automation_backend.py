@@ -0,0 +1,318 @@
+# automation_backend.py
+"""
+Platform automation backends.
+
+Every action used to pay for a fresh shell (os.system("osascript ...")).
+Backends here keep one long-lived helper process and talk to it over a pipe,
+so an action is a line written to stdin and a line read back. Requests can be
+batched: run() sends every action first and then collects the replies.
+
+Actions are tuples: ("set_volume", 40), ("set_muted", True),
+("open_app", "Safari"), ("open_url", "https://...").
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import atexit
+import select
+import tempfile
+import threading
+import subprocess
+
+import config
+
+
+class AutomationError(Exception):
+    pass
+
+
+class AutomationBackend:
+    """Interface. Subclasses implement run(); the helpers below are sugar over it."""
+    name = "base"
+
+    def run(self, actions):
+        """Executes a batch of actions, returning one bool (success) per action"""
+        raise NotImplementedError
+
+    def set_volume(self, level):
+        return self.run([("set_volume", max(0, min(100, int(level))))])[0]
+
+    def set_muted(self, muted):
+        return self.run([("set_muted", bool(muted))])[0]
+
+    def open_app(self, app_name):
+        return self.run([("open_app", app_name)])[0]
+
+    def open_url(self, url):
+        return self.run([("open_url", url)])[0]
+
+    def close(self):
+        pass
+
+
+# --- 1. Helper-process plumbing ---
+class HelperProcessBackend(AutomationBackend):
+    """
+    Owns one line-oriented helper process and restarts it if it dies. A batch
+    whose replies do not arrive within reply_timeout kills the helper, so one
+    stalled request cannot block every later action behind the lock.
+    """
+    def __init__(self, reply_timeout=None):
+        self._proc = None
+        self._lock = threading.Lock()
+        self.reply_timeout = config.AUTOMATION_REPLY_TIMEOUT if reply_timeout is None else reply_timeout
+        atexit.register(self.close)
+
+    def helper_command(self):
+        raise NotImplementedError
+
+    def encode(self, action):
+        """Turns an action into one request line for the helper"""
+        raise NotImplementedError
+
+    def parse_reply(self, line):
+        raise NotImplementedError
+
+    def _ensure_helper(self):
+        if self._proc is None or self._proc.poll() is not None:
+            # Unbuffered binary pipes: replies are read with select() and a deadline
+            self._proc = subprocess.Popen(
+                self.helper_command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, bufsize=0)
+        return self._proc
+
+    def _read_replies(self, proc, count):
+        """
+        (replies, timed_out): up to count reply lines. Fewer come back if the
+        helper died or missed the deadline.
+        """
+        deadline = time.monotonic() + self.reply_timeout
+        fd = proc.stdout.fileno()
+        buffer = b""
+        timed_out = False
+        while buffer.count(b"\n") < count:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                timed_out = True
+                break
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            buffer += chunk
+        complete = min(count, buffer.count(b"\n"))
+        return buffer.decode(errors="replace").split("\n")[:complete], timed_out
+
+    def run(self, actions):
+        if not actions:
+            return []
+        pending = [self.encode(action) for action in actions]
+        results = []
+        with self._lock:
+            for attempt in range(2):
+                proc = self._ensure_helper()
+                try:
+                    proc.stdin.write("".join(line + "\n" for line in pending).encode())
+                    proc.stdin.flush()
+                    replies, timed_out = self._read_replies(proc, len(pending))
+                except (BrokenPipeError, OSError):
+                    replies, timed_out = [], False
+                results.extend(self.parse_reply(reply.strip()) for reply in replies)
+                # Actions that already replied ran once; never send them again
+                pending = pending[len(replies):]
+                if not pending:
+                    return results
+                self._kill()
+                if timed_out:
+                    # A stalled request would stall again; give up instead of retrying
+                    raise AutomationError(f"{self.name} helper timed out")
+                # Helper died mid-batch; restart it once and send the rest
+        raise AutomationError(f"{self.name} helper is not responding")
+
+    def _kill(self):
+        if self._proc is not None:
+            try:
+                self._proc.kill()
+            except Exception:
+                pass
+            self._proc = None
+
+    def close(self):
+        with self._lock:
+            if self._proc is not None and self._proc.poll() is None:
+                try:
+                    self._proc.stdin.close()
+                    self._proc.wait(timeout=1)
+                except Exception:
+                    self._kill()
+            self._proc = None
+
+
+# --- 2. macOS: one JXA process executing AppleScript in-process ---
+_JXA_HELPER = r"""
+ObjC.import('Foundation');
+var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+function reply(text) {
+    stdout.writeData($(text + '\n').dataUsingEncoding($.NSUTF8StringEncoding));
+}
+var buffer = '';
+while (true) {
+    var data = stdin.availableData;
+    if (data.length == 0) break;
+    buffer += $.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding).js;
+    var lines = buffer.split('\n');
+    buffer = lines.pop();
+    for (var i = 0; i < lines.length; i++) {
+        if (!lines[i]) continue;
+        try {
+            var script = $.NSAppleScript.alloc.initWithSource(JSON.parse(lines[i]));
+            var result = script.executeAndReturnError($());
+            reply(result && !result.isNil() ? 'ok' : 'error');
+        } catch (e) {
+            reply('error');
+        }
+    }
+}
+"""
+
+
+def _applescript_string(text):
+    """An AppleScript string literal. AppleScript only knows the \\ and \\" escapes."""
+    return '"' + str(text).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class MacBackend(HelperProcessBackend):
+    name = "mac"
+
+    def __init__(self):
+        super().__init__()
+        self._script_path = None
+
+    def helper_command(self):
+        if self._script_path is None or not os.path.exists(self._script_path):
+            fd, self._script_path = tempfile.mkstemp(prefix="blaze_helper_", suffix=".js")
+            with os.fdopen(fd, "w") as f:
+                f.write(_JXA_HELPER)
+        return ["osascript", "-l", "JavaScript", self._script_path]
+
+    def encode(self, action):
+        kind, value = action
+        if kind == "set_volume":
+            source = f"set volume output volume {int(value)}"
+        elif kind == "set_muted":
+            source = f"set volume output muted {'true' if value else 'false'}"
+        elif kind == "open_app":
+            # open -a fails cleanly for unknown names; "tell application" would
+            # block the helper on AppleScript's "Where is ...?" chooser
+            source = f"do shell script \"open -a \" & quoted form of {_applescript_string(value)}"
+        elif kind == "open_url":
+            source = f"open location {_applescript_string(value)}"
+        else:
+            raise AutomationError(f"Unsupported action: {kind}")
+        # The line itself stays ASCII: JSON.parse in the helper restores any \u escapes
+        return json.dumps(source)
+
+    def parse_reply(self, line):
+        return line == "ok"
+
+    def close(self):
+        super().close()
+        if self._script_path and os.path.exists(self._script_path):
+            os.remove(self._script_path)
+            self._script_path = None
+
+
+# --- 3. Linux: one persistent shell driving pactl / xdg-open ---
+class LinuxBackend(HelperProcessBackend):
+    """
+    A single sh process receives the whole batch in one write. pactl and
+    xdg-open are still executed, but there is no Python-side process setup per
+    action and a batch costs one round trip.
+    """
+    name = "linux"
+
+    def helper_command(self):
+        return ["/bin/sh"]
+
+    def encode(self, action):
+        kind, value = action
+        if kind == "set_volume":
+            command = f"pactl set-sink-volume @DEFAULT_SINK@ {int(value)}%"
+        elif kind == "set_muted":
+            command = f"pactl set-sink-mute @DEFAULT_SINK@ {1 if value else 0}"
+        elif kind == "open_app":
+            app = shlex.quote(str(value).lower())
+            # gtk-launch returns once the app is started, so its status is real;
+            # the fallback is only backgrounded after checking the binary exists
+            command = f"gtk-launch {app} || {{ command -v {app} && (setsid {app} &) ; }}"
+        elif kind == "open_url":
+            command = f"setsid xdg-open {shlex.quote(str(value))} >/dev/null 2>&1 &"
+        else:
+            raise AutomationError(f"Unsupported action: {kind}")
+        # Silence the command so the only stdout line is its exit status
+        terminator = "" if command.endswith("&") else " ;"
+        return f"{{ {command}{terminator} }} >/dev/null 2>&1; echo $?"
+
+    def parse_reply(self, line):
+        return line == "0"
+
+
+# --- 4. Fake backend for tests and benchmarks ---
+class FakeBackend(AutomationBackend):
+    """Records actions and keeps simulated state; never touches the system"""
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+        self.batches = 0
+        self.volume = 50
+        self.muted = False
+        self.opened = []
+
+    def run(self, actions):
+        self.batches += 1
+        results = []
+        for kind, value in actions:
+            self.calls.append((kind, value))
+            if kind == "set_volume":
+                self.volume = int(value)
+            elif kind == "set_muted":
+                self.muted = bool(value)
+            elif kind in ("open_app", "open_url"):
+                self.opened.append(value)
+            else:
+                results.append(False)
+                continue
+            results.append(True)
+        return results
+
+
+# --- 5. Selection ---
+BACKENDS = {"mac": MacBackend, "linux": LinuxBackend, "fake": FakeBackend}
+_backend = None
+
+
+def create_backend(name="auto"):
+    if name == "auto":
+        name = "mac" if sys.platform == "darwin" else "linux"
+    if name not in BACKENDS:
+        raise AutomationError(f"Unknown automation backend: {name}")
+    return BACKENDS[name]()
+
+
+def get_backend():
+    """Returns the process-wide backend, created on first use"""
+    global _backend
+    if _backend is None:
+        _backend = create_backend(os.environ.get("BLAZE_AUTOMATION_BACKEND", config.AUTOMATION_BACKEND))
+    return _backend
+
+
+def set_backend(backend):
+    """Swaps the process-wide backend (e.g. FakeBackend() in tests)"""
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
@@ -0,0 +1,93 @@
+# benchmarks/bench_intents.py
+"""
+Micro-benchmark: intent dispatch over a large intent set.
+Compares the indexed IntentRouter with the old ordered substring chain.
+
+    python benchmarks/bench_intents.py [--intents 2000] [--commands 5000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import intents
+
+
+def build_vocabulary(count, seed=7):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def build_commands(vocabulary, count, seed=11):
+    rng = random.Random(seed)
+    filler = ["blaze", "please", "can", "you", "the", "for", "me", "now", "set", "to"]
+    commands = []
+    for _ in range(count):
+        words = rng.sample(filler, 3) + [rng.choice(vocabulary)] + [str(rng.randint(0, 100))]
+        rng.shuffle(words)
+        commands.append(" ".join(words))
+    return commands
+
+
+def substring_chain(keywords, command):
+    """The pre-router behaviour: first keyword contained anywhere in the command wins"""
+    for keyword in keywords:
+        if keyword in command:
+            return keyword
+    return None
+
+
+def timed(fn, commands, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for command in commands:
+            fn(command)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(intent_count=2000, command_count=5000, repeat=5):
+    vocabulary = build_vocabulary(intent_count)
+    commands = build_commands(vocabulary, command_count)
+
+    router = intents.IntentRouter(stop_words={"blaze"})
+    for word in vocabulary:
+        router.register(word, lambda match: None, keywords=[word])
+    router.compile()
+
+    router_time = timed(router.match, commands, repeat)
+    chain_time = timed(lambda c: substring_chain(vocabulary, c), commands, repeat)
+
+    return {
+        "intents": intent_count,
+        "commands": command_count,
+        "router_us_per_command": router_time / command_count * 1e6,
+        "chain_us_per_command": chain_time / command_count * 1e6,
+        "speedup": chain_time / router_time if router_time else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--intents", type=int, default=2000)
+    parser.add_argument("--commands", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    result = run(args.intents, args.commands, args.repeat)
+    print(f"Intents: {result['intents']}  Commands: {result['commands']}")
+    print(f"Indexed router : {result['router_us_per_command']:.2f} us/command")
+    print(f"Substring chain: {result['chain_us_per_command']:.2f} us/command")
+    print(f"Speedup        : {result['speedup']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
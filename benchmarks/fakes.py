@@ -0,0 +1,164 @@
+# benchmarks/fakes.py
+"""
+Local stand-ins for the hardware/network dependencies on Blaze's hot paths:
+edge_tts (TTS), speech_recognition (microphone + recogniser), pyautogui,
+pywhatkit and cv2.VideoCapture (camera).
+
+install() must run before the Blaze modules are imported. It registers the
+fake modules in sys.modules, so speech_engine's microphone calibration and
+automation's pyautogui import never touch real devices.
+"""
+import sys
+import time
+import types
+import asyncio
+
+# Simulated latencies in seconds. Zero measures Blaze's own overhead only.
+LATENCY = {"tts": 0.0, "listen": 0.0, "recognize": 0.0, "camera": 0.0}
+
+FAKE_MP3 = b"ID3" + b"\x00" * 1021
+
+
+# --- edge_tts ---
+class FakeCommunicate:
+    calls = 0
+
+    def __init__(self, text, voice):
+        self.text = text
+        self.voice = voice
+
+    async def save(self, path):
+        FakeCommunicate.calls += 1
+        if LATENCY["tts"]:
+            await asyncio.sleep(LATENCY["tts"])
+        with open(path, "wb") as f:
+            f.write(FAKE_MP3)
+
+
+# --- speech_recognition ---
+class WaitTimeoutError(Exception):
+    pass
+
+
+class UnknownValueError(Exception):
+    pass
+
+
+class RequestError(Exception):
+    pass
+
+
+class FakeAudioData:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeMicrophone:
+    """Plays back a script of utterances; an empty script behaves like silence"""
+    script = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeRecognizer:
+    def __init__(self):
+        self.energy_threshold = 300
+        self.dynamic_energy_threshold = True
+        self.pause_threshold = 0.8
+
+    def adjust_for_ambient_noise(self, source, duration=1):
+        pass
+
+    def listen(self, source, timeout=None, phrase_time_limit=None):
+        if LATENCY["listen"]:
+            time.sleep(LATENCY["listen"])
+        if not FakeMicrophone.script:
+            raise WaitTimeoutError("listening timed out")
+        return FakeAudioData(FakeMicrophone.script.pop(0))
+
+    def recognize_google(self, audio):
+        if LATENCY["recognize"]:
+            time.sleep(LATENCY["recognize"])
+        if not audio.text:
+            raise UnknownValueError()
+        return audio.text
+
+
+# --- pyautogui ---
+class FakeImage:
+    mode = "RGB"
+
+    def __init__(self, size=(1920, 1080)):
+        self.size = size
+
+    def convert(self, mode):
+        return self
+
+    def save(self, path, fmt=None, **options):
+        with open(path, "wb") as f:
+            f.write(b"\x89PNG" + b"\x00" * 60)
+
+
+# --- cv2.VideoCapture ---
+class FakeVideoCapture:
+    """Returns synthetic BGR frames at the requested resolution"""
+    def __init__(self, index=0):
+        import numpy as np
+        self._np = np
+        self.width = 640
+        self.height = 480
+        self.frames = 0
+        self._frame = None
+
+    def set(self, prop, value):
+        import cv2
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        self._frame = None
+        return True
+
+    def read(self):
+        if LATENCY["camera"]:
+            time.sleep(LATENCY["camera"])
+        if self._frame is None:
+            rng = self._np.random.default_rng(0)
+            self._frame = rng.integers(0, 255, (self.height, self.width, 3), dtype=self._np.uint8)
+        self.frames += 1
+        return True, self._frame
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+def install():
+    """Registers the fake modules and patches cv2.VideoCapture when cv2 is present"""
+    sys.modules["edge_tts"] = _module("edge_tts", Communicate=FakeCommunicate)
+    sys.modules["speech_recognition"] = _module(
+        "speech_recognition", Recognizer=FakeRecognizer, Microphone=FakeMicrophone,
+        AudioData=FakeAudioData, WaitTimeoutError=WaitTimeoutError,
+        UnknownValueError=UnknownValueError, RequestError=RequestError)
+    sys.modules["pyautogui"] = _module(
+        "pyautogui", screenshot=lambda region=None: FakeImage(), hotkey=lambda *keys: None)
+    sys.modules["pywhatkit"] = _module(
+        "pywhatkit", search=lambda query: None, playonyt=lambda video: None)
+    try:
+        import cv2
+        import numpy  # noqa: F401  (FakeVideoCapture needs it)
+        cv2.VideoCapture = FakeVideoCapture
+    except ImportError:
+        pass
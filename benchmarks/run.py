@@ -0,0 +1,391 @@
+# benchmarks/run.py
+"""
+Offline benchmark suite for Blaze's hot paths.
+
+TTS, microphone, camera and desktop automation are replaced by the local
+stand-ins in benchmarks/fakes.py, so results measure Blaze's own code and
+are comparable between commits. Benchmarks whose optional dependencies
+(cv2, numpy, PyQt6) are missing are reported as skipped.
+
+    python benchmarks/run.py [--output results.json] [--quick]
+    python benchmarks/run.py --compare old.json new.json [--threshold 10]
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import contextlib
+import tempfile
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fakes
+
+
+# --- 1. Harness ---
+class Skip(Exception):
+    pass
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def measure(fn, iterations, warmup=3):
+    """Calls fn() repeatedly; returns per-call timing stats in microseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    mean = sum(samples) / len(samples)
+    return {
+        "n": iterations,
+        "mean_us": round(mean, 3),
+        "p50_us": round(percentile(samples, 50), 3),
+        "p95_us": round(percentile(samples, 95), 3),
+        "min_us": round(min(samples), 3),
+        "ops_per_s": round(1e6 / mean, 1) if mean else None,
+    }
+
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    def decorator(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return decorator
+
+
+# --- 2. Benchmarks ---
+@benchmark("voice_cache.lookup_hit")
+def bench_cache_hit(scale):
+    import speech_engine
+    text = "Access granted"
+    path = speech_engine.get_cache_path(text)
+    with open(path, "wb") as f:
+        f.write(fakes.FAKE_MP3)
+    return measure(lambda: os.path.exists(speech_engine.get_cache_path(text)), 2000 * scale)
+
+
+@benchmark("voice_cache.lookup_miss")
+def bench_cache_miss(scale):
+    import speech_engine
+    return measure(lambda: os.path.exists(speech_engine.get_cache_path("never spoken phrase")),
+                   2000 * scale)
+
+
+@benchmark("tts.pipeline_cold")
+def bench_tts_cold(scale):
+    import speech_engine
+    counter = iter(range(10 ** 9))
+    return measure(lambda: speech_engine._run_speak_thread(f"cold phrase {next(counter)}"), 100 * scale)
+
+
+@benchmark("tts.pipeline_warm")
+def bench_tts_warm(scale):
+    import speech_engine
+    speech_engine._run_speak_thread("Welcome back, Sir.")
+    return measure(lambda: speech_engine._run_speak_thread("Welcome back, Sir."), 1000 * scale)
+
+
+@benchmark("speech.listen")
+def bench_listen(scale):
+    import speech_engine
+    iterations = 500 * scale
+
+    def listen_once():
+        fakes.FakeMicrophone.script.append("blaze what time is it")
+        speech_engine.listen()
+    return measure(listen_once, iterations)
+
+
+class NoopHandlers:
+    """Stands in for the main window: every cmd_* handler does nothing"""
+    def __getattr__(self, name):
+        return lambda match: None
+
+
+@benchmark("dispatch.builtin")
+def bench_dispatch_builtin(scale):
+    import intents
+    router = intents.IntentRouter(stop_words={"blaze"})
+    # The real built-in table; handlers are no-ops so only matching is measured
+    intents.register_builtins(router, NoopHandlers())
+    commands = ["blaze what time is it", "blaze open safari", "blaze set volume to 40",
+                "blaze unmute", "blaze sometimes i wonder", "blaze search for cats"]
+    state = {"i": 0}
+
+    def dispatch():
+        state["i"] += 1
+        router.dispatch(commands[state["i"] % len(commands)])
+    return measure(dispatch, 5000 * scale)
+
+
+@benchmark("dispatch.large_intent_set")
+def bench_dispatch_large(scale):
+    import bench_intents
+    result = bench_intents.run(intent_count=2000, command_count=500 * scale, repeat=3)
+    return {"n": result["commands"], "mean_us": round(result["router_us_per_command"], 3),
+            "baseline_chain_us": round(result["chain_us_per_command"], 3),
+            "speedup": round(result["speedup"], 2)}
+
+
+@benchmark("automation.fake_backend")
+def bench_automation(scale):
+    import automation_backend
+    import automation
+    automation_backend.set_backend(automation_backend.FakeBackend())
+    return measure(lambda: automation.set_volume(40), 2000 * scale)
+
+
+@benchmark("screenshot.capture")
+def bench_screenshot(scale):
+    import screenshot_service
+    screenshot_service.mss = None  # Force the (faked) pyautogui grab
+    service = screenshot_service.ScreenshotService(directory="screenshots", max_pending=10 ** 6)
+    result = measure(service.capture, 200 * scale)
+    service.wait_idle()
+    return result
+
+
+@benchmark("tracing.span")
+def bench_tracing(scale):
+    import tracing
+
+    def record():
+        with tracing.span("bench.span", trace="bench"):
+            pass
+    result = measure(record, 5000 * scale)
+    tracing.shutdown()
+    return result
+
+
+def _require_cv2():
+    try:
+        import cv2
+        import numpy
+        return cv2, numpy
+    except ImportError as e:
+        raise Skip(f"missing {e.name}")
+
+
+@benchmark("camera.preview_conversion")
+def bench_preview(scale):
+    cv2, np = _require_cv2()
+    frame = fakes.FakeVideoCapture().read()[1]
+    try:
+        from PyQt6.QtWidgets import QApplication  # noqa: F401
+    except ImportError:
+        # Without Qt, time the OpenCV half of the conversion only
+        def convert():
+            resized = cv2.resize(frame, (533, 400))
+            cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+        return measure(convert, 500 * scale)
+    _qt_app()
+    import blaze_pyqt_main
+    signals = blaze_pyqt_main.FaceAuthSignals()
+    return measure(lambda: signals.update_camera_frame(frame), 500 * scale)
+
+
+@benchmark("face_auth.detect_frame")
+def bench_detect(scale):
+    cv2, np = _require_cv2()
+    import face_auth
+    cap = cv2.VideoCapture(0)
+    frame = cap.read()[1]
+
+    def detect():
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        face_auth.detect_faces(gray)
+    return measure(detect, 50 * scale)
+
+
+@benchmark("face_auth.verify_frame")
+def bench_verify(scale):
+    cv2, np = _require_cv2()
+    if not hasattr(cv2, "face"):
+        raise Skip("missing cv2.face (opencv-contrib)")
+    import face_auth
+    rng = np.random.default_rng(1)
+    samples = [rng.integers(0, 255, (120, 120), dtype=np.uint8) for _ in range(20)]
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.train(samples, np.ones(len(samples), dtype=np.int32))
+    gray = rng.integers(0, 255, (480, 640), dtype=np.uint8)
+    faces = [(100, 100, 120, 120)]
+    return measure(lambda: face_auth.matches_user(recognizer, gray, faces), 200 * scale)
+
+
+_app = None
+
+
+def _qt_app():
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication([])
+    return _app
+
+
+def _paint_benchmark(widget_name, scale, prepare=None):
+    try:
+        from PyQt6.QtGui import QImage
+    except ImportError:
+        raise Skip("missing PyQt6")
+    try:
+        import cv2  # noqa: F401  (blaze_pyqt_main imports cv2 at module level)
+    except ImportError:
+        raise Skip("missing cv2")
+    _qt_app()
+    import blaze_pyqt_main
+    widget = getattr(blaze_pyqt_main, widget_name)()
+    if prepare:
+        prepare(widget)
+    image = QImage(widget.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    return measure(lambda: widget.render(image), 200 * scale)
+
+
+@benchmark("paint.siri_orb")
+def bench_paint_orb(scale):
+    return _paint_benchmark("SiriOrb", scale, lambda w: w.set_state("speaking"))
+
+
+@benchmark("paint.face_verification")
+def bench_paint_face(scale):
+    return _paint_benchmark("FaceVerificationWidget", scale, lambda w: w.start_scan())
+
+
+@benchmark("paint.boot_sequence")
+def bench_paint_boot(scale):
+    def prepare(widget):
+        widget.frame_count, widget.ring_scale, widget.opacity = 35, 1.0, 255
+        widget.hex_codes = ["0x00"] * 4
+    return _paint_benchmark("BootSequenceWidget", scale, prepare)
+
+
+@benchmark("paint.hud")
+def bench_paint_hud(scale):
+    return _paint_benchmark("SystemMonitor", scale)
+
+
+# --- 3. Runner ---
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def run_suite(scale=1, only=None):
+    workdir = tempfile.mkdtemp(prefix="blaze_bench_")
+    cwd = os.getcwd()
+    os.chdir(workdir)  # voice_cache/, screenshots/ and traces/ land in the scratch dir
+    fakes.install()
+    import config
+    config.TRACE_PATH = os.path.join(workdir, "traces", "bench.jsonl")
+    import speech_engine
+    speech_engine._play = lambda file_path, trace=None, text="": None  # No afplay
+
+    results = {}
+    try:
+        for name, fn in BENCHMARKS:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            try:
+                # Blaze prints as it talks and listens; keep the report readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results[name] = fn(scale)
+            except Skip as e:
+                results[name] = {"skipped": str(e)}
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+            print(format_result(name, results[name]))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "results": results,
+    }
+
+
+def format_result(name, result):
+    if "skipped" in result:
+        return f"{name:<32} skipped ({result['skipped']})"
+    if "error" in result:
+        return f"{name:<32} ERROR {result['error']}"
+    line = f"{name:<32}{result['mean_us']:>12.2f} us"
+    if "p95_us" in result:
+        line += f"  p95 {result['p95_us']:>10.2f} us"
+    return line
+
+
+def compare(old_path, new_path, threshold):
+    """Prints mean-time ratios between two result files; returns 1 if anything regressed"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{'benchmark':<32}{old['revision']:>12}{new['revision']:>12}{'change':>10}")
+    regressed = False
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        a = old["results"].get(name, {}).get("mean_us")
+        b = new["results"].get(name, {}).get("mean_us")
+        if a is None or b is None:
+            print(f"{name:<32}{'-' if a is None else f'{a:.2f}':>12}{'-' if b is None else f'{b:.2f}':>12}")
+            continue
+        change = (b - a) / a * 100 if a else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{name:<32}{a:>12.2f}{b:>12.2f}{change:>+9.1f}%{flag}")
+    return 1 if regressed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blaze offline benchmark suite")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--scale", type=int, default=1, help="iteration multiplier")
+    parser.add_argument("--only", action="append", help="run benchmarks with this name prefix")
+    parser.add_argument("--tts-latency", type=float, default=0.0, help="simulated TTS seconds")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in %%")
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(args.compare[0], args.compare[1], args.threshold)
+
+    fakes.LATENCY["tts"] = args.tts_latency
+    report = run_suite(scale=1 if args.quick else max(1, args.scale) * 5, only=args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
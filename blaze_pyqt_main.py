@@ -5,7 +5,7 @@ import cv2
 import numpy as np
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QGraphicsDropShadowEffect, 
-                             QProgressBar, QFrame, QScrollArea)
+                             QProgressBar, QFrame, QScrollArea, QStackedWidget)
 from PyQt6.QtCore import (Qt, QTimer, QPropertyAnimation, QEasingCurve, 
                           QPoint, QPointF, pyqtSignal, QThread, QObject, QRectF, QTime, QDate)
 from PyQt6.QtGui import (QPainter, QColor, QPen, QBrush, QRadialGradient, 
@@ -20,6 +20,15 @@ import config
 import speech_engine as io
 import face_auth
 import automation
+import intents
+import tracing
+import metrics
+import prefetcher
+import notes_store
+import performance
+import workers
+import presence
+from command_executor import CommandExecutor
 
 # Optional dependency for system stats
 try:
@@ -42,17 +51,9 @@ class FaceAuthSignals(QObject):
 
     def update_camera_frame(self, frame):
         try:
-            h, w, ch = frame.shape
-            target_size = 400
-            scale = max(target_size / w, target_size / h)
-            new_w = int(w * scale)
-            new_h = int(h * scale)
-            
-            resized_frame = cv2.resize(frame, (new_w, new_h))
-            rgb_image = cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
-            bytes_per_line = ch * new_w
-            
-            qt_image = QImage(rgb_image.data, new_w, new_h, bytes_per_line, QImage.Format.Format_RGB888)
+            rgb_image = face_auth.preview_rgb(frame)
+            h, w, ch = rgb_image.shape
+            qt_image = QImage(rgb_image.data, w, h, ch * w, QImage.Format.Format_RGB888)
             self.cam_update.emit(qt_image.copy())
         except Exception:
             pass
@@ -65,25 +66,7 @@ class FaceAuthThread(QThread):
     def run(self):
         time.sleep(0.5) 
         try:
-            if not face_auth.is_user_registered():
-                self.signals.update_status("UNKNOWN ENTITY")
-                self.signals.update_progress("ALIGN FACE FOR CAPTURE")
-                io.speak("Identity not found. Starting registration.")
-                success = face_auth.capture_and_train_qt(self.signals)
-                if success:
-                    self.signals.update_status("REGISTRATION COMPLETE")
-                    io.speak("Registration successful.")
-                    self.signals.auth_result.emit(True)
-                else:
-                    self.signals.update_status("REGISTRATION FAILED")
-                    self.signals.auth_result.emit(False)
-                return
-
-            self.signals.update_status("BIOMETRIC SCAN")
-            self.signals.update_progress("Scanning...") 
-            io.speak("Scanning biometric data")
-            
-            verified = face_auth.verify_user_qt(self.signals)
+            verified = face_auth.authenticate(self.signals, io.speak)
             self.signals.auth_result.emit(verified)
 
         except Exception as e:
@@ -98,12 +81,17 @@ class VoiceThread(QThread):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.running = False
+        self.paused = False
         
     def run(self):
         self.running = True
         while self.running:
+            if self.paused:
+                time.sleep(0.1)
+                continue
             command = io.listen()
             if self.running and command != "none":
+                tracing.mark("voice.command_emitted")
                 self.command_received.emit(command)
             time.sleep(0.1)
     
@@ -111,6 +99,103 @@ class VoiceThread(QThread):
         self.running = False
 
 
+class FaceAuthProcessThread(QThread):
+    """
+    FaceAuthThread for multi-process mode: camera and LBPH run in a worker process.
+    After access is granted the worker runs the presence checks, and this thread
+    keeps draining its events until stop(). With scan=False it only does that.
+    """
+    def __init__(self, signals, scan=True):
+        super().__init__()
+        self.signals = signals
+        self.scan = scan
+        self.running = True
+
+    def run(self):
+        pipeline = workers.FacePipeline()
+        pipeline.start(performance.active(), scan=self.scan)
+        verified = None if self.scan else True
+        while verified is None:
+            events = pipeline.poll()
+            for kind, *args in events:
+                if kind == "status":
+                    self.signals.update_status(args[0])
+                elif kind == "progress":
+                    self.signals.update_progress(args[0])
+                elif kind == "speak":
+                    io.speak(args[0])
+                elif kind == "frame":
+                    self.show_frame(pipeline.frames, *args)
+                elif kind == "result":
+                    verified = args[0]
+                elif kind == "error":
+                    print(f"Error: {args[0]}")
+                    self.signals.update_status("SYSTEM ERROR")
+                    verified = False
+            if verified is None and not events and not pipeline.alive():
+                self.signals.update_status("SYSTEM ERROR")
+                verified = False
+        if self.scan:
+            self.signals.auth_result.emit(verified)
+        if verified and config.PRESENCE_ENABLED:
+            # Presence checks: the worker's trace records still arrive on the event queue
+            while self.running and pipeline.alive():
+                for kind, *args in pipeline.poll(timeout=0.5):
+                    if kind == "error":
+                        print(f"Presence error: {args[0]}")
+        pipeline.stop()
+
+    def stop(self):
+        self.running = False
+
+    def show_frame(self, frames, slot, seq, w, h):
+        # Wrap the shared slot without copying; .copy() is the only copy made
+        image = QImage(frames.view(slot, w * h * 3), w, h, w * 3, QImage.Format.Format_RGB888).copy()
+        # Drop the frame if the worker reused the slot while we were copying it
+        if frames.valid(slot, seq):
+            self.signals.cam_update.emit(image)
+
+
+class VoiceProcessThread(QThread):
+    """VoiceThread for multi-process mode: capture and recognition run in worker processes"""
+    command_received = pyqtSignal(str)
+    # Dictated note text, or "none"
+    note_received = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = False
+        self.paused = False
+        self.pipeline = workers.VoicePipeline()
+        performance.on_change(lambda name, settings: self.pipeline.set_profile(name))
+
+    def run(self):
+        self.running = True
+        self.pipeline.start(performance.active())
+        while self.running:
+            # Keep the worker's microphone closed while paused or while Blaze is talking
+            self.pipeline.set_listening(not self.paused and not io.is_speaking())
+            for kind, *args in self.pipeline.poll():
+                if kind == "heard":
+                    command = io.accept_recognition(*args)
+                    if self.running and command != "none":
+                        tracing.mark("voice.command_emitted")
+                        self.command_received.emit(command)
+                elif kind == "note":
+                    self.note_received.emit(io.accept_recognition(*args) if args[0] else "none")
+                elif kind == "dropped":
+                    metrics.incr("voice.dropped_utterances", reason=args[0])
+                elif kind == "error":
+                    print(f"Error: {args[0]}")
+        self.pipeline.stop()
+
+    def request_note(self):
+        self.pipeline.request_note()
+
+    def stop(self):
+        self.running = False
+
+
 # --- 2. NEW WIDGETS ---
 
 class HUDClock(QWidget):
@@ -118,9 +203,16 @@ class HUDClock(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedSize(200, 80)
+        self.interval = 1000
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update)
-        self.timer.start(1000)
+
+    def resume(self):
+        self.timer.start(self.interval)
+        self.update()
+
+    def park(self):
+        self.timer.stop()
 
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -140,18 +232,29 @@ class HUDClock(QWidget):
 
 class SystemMonitor(QWidget):
     """Circular Progress Bars for CPU and RAM"""
+    profile_key = "stats_interval_ms"
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedSize(200, 100)
         self.cpu_usage = 0
         self.ram_usage = 0
+        # Its own baseline, so it does not disturb auto mode's CPU samples
+        self.cpu = performance.CpuSampler()
+        self.interval = performance.get(self.profile_key)
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_stats)
-        self.timer.start(2000)
+
+    def resume(self):
+        self.update_stats()
+        self.timer.start(self.interval)
+
+    def park(self):
+        self.timer.stop()
 
     def update_stats(self):
         if psutil:
-            self.cpu_usage = psutil.cpu_percent()
+            self.cpu_usage = self.cpu.percent()
             self.ram_usage = psutil.virtual_memory().percent
         else:
             self.cpu_usage = random.randint(10, 30) # Mock data if library missing
@@ -195,21 +298,31 @@ class BootSequenceWidget(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.timer = QTimer()
+        self.interval = 30
+        self.timer = QTimer(self)
         self.timer.timeout.connect(self.animate)
-        self.frame_count = 0
         self.max_frames = 90
+        self.reset()
+
+    def reset(self):
+        self.frame_count = 0
         self.opacity = 0
         self.ring_scale = 0.0
         self.loading_text = ""
         self.hex_codes = []
-        
-        self.timer.start(30)
+
+    def resume(self):
+        """Plays the sequence from the first frame"""
+        self.reset()
+        self.timer.start(self.interval)
         try:
             os.system("afplay /System/Library/Sounds/Glass.aiff &")
         except:
             pass
 
+    def park(self):
+        self.timer.stop()
+
     def animate(self):
         self.frame_count += 1
         if self.frame_count < 40:
@@ -260,16 +373,24 @@ class BootSequenceWidget(QWidget):
 
 class SiriOrb(QWidget):
     """Arc Reactor Style Assistant"""
+    profile_key = "animation_interval_ms"
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.angle = 0
         self.pulse = 0
         self.state = "idle"
-        self.timer = QTimer()
+        self.interval = performance.get(self.profile_key)
+        self.timer = QTimer(self)
         self.timer.timeout.connect(self.animate)
-        self.timer.start(24)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.setFixedSize(500, 500)
+
+    def resume(self):
+        self.timer.start(self.interval)
+
+    def park(self):
+        self.timer.stop()
     
     def set_state(self, state):
         self.state = state
@@ -315,6 +436,8 @@ class SiriOrb(QWidget):
 
 class FaceVerificationWidget(QWidget):
     """Face verification with Aspect Ratio Fix & SUCCESS STATE"""
+    profile_key = "animation_interval_ms"
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.angle = 0
@@ -322,11 +445,17 @@ class FaceVerificationWidget(QWidget):
         self.scanning = False
         self.success = False 
         self.camera_frame = None 
-        self.timer = QTimer()
+        self.interval = performance.get(self.profile_key)
+        self.timer = QTimer(self)
         self.timer.timeout.connect(self.animate)
-        self.timer.start(24) 
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.setFixedSize(400, 400)
+
+    def resume(self):
+        self.timer.start(self.interval)
+
+    def park(self):
+        self.timer.stop()
     
     def start_scan(self):
         self.scanning = True
@@ -415,12 +544,52 @@ class FaceVerificationWidget(QWidget):
                 painter.drawLine(cx - 5, cy + 20, cx + 30, cy - 30)
 
 
+class ScreenPage(QWidget):
+    """A pre-built screen in the content stack. Parked pages keep their timers stopped."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.animated = []
+
+    def track(self, widget):
+        self.animated.append(widget)
+        return widget
+
+    def resume(self):
+        for widget in self.animated:
+            widget.resume()
+
+    def park(self):
+        for widget in self.animated:
+            widget.park()
+
+    def retune(self, settings):
+        """Applies a performance profile's timer intervals, restarting running timers"""
+        for widget in self.animated:
+            key = getattr(widget, "profile_key", None)
+            if key is None:
+                continue
+            widget.interval = settings[key]
+            if widget.timer.isActive():
+                widget.timer.start(widget.interval)
+
+
 class BlazeMainWindow(QMainWindow):
     def __init__(self):
-        self._last_command_time = 0
         self._assistant_busy = False
-        self._last_command = None
         super().__init__()
+        # Blocking command work runs off the GUI thread; results come back as signals
+        self.executor = CommandExecutor(max_workers=3, default_timeout=30.0, parent=self)
+        self.repeats = intents.RepeatFilter(config.COMMAND_DEDUPE_SECONDS, self.executor.running)
+        self.executor.progress.connect(self.on_command_progress)
+        self.executor.failed.connect(self.on_command_failed)
+        self.executor.timed_out.connect(self.on_command_timed_out)
+        self.executor.busy_changed.connect(self.on_busy_changed)
+        # Built-ins go on the shared router first; plugins may override them by name
+        self.router = intents.router
+        self.router.stop_words.add(config.WAKE_WORD)
+        self.register_intents()
+        intents.load_plugins()
+        self.prefetcher = prefetcher.get_prefetcher()
         self.setWindowTitle("Blaze Voice Assistant")
         self.setFixedSize(1000, 700)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
@@ -435,18 +604,46 @@ class BlazeMainWindow(QMainWindow):
         self.content_layout = QVBoxLayout(self.content_widget)
         self.content_layout.setContentsMargins(20, 20, 20, 20)
         self.main_layout.addWidget(self.content_widget)
-        self.setup_verification_screen()
+
+        # --- SCREEN STACK ---
+        # Only the verification screen is needed at launch. The boot and assistant
+        # screens are built while the event loop is idle during authentication,
+        # so every later transition is a plain stack switch.
+        self.content_stack = QStackedWidget()
+        self.content_layout.addWidget(self.content_stack)
+        self.screens = {}
+        self.screen_builders = {
+            "verification": self.setup_verification_screen,
+            "boot": self.setup_boot_screen,
+            "assistant": self.setup_assistant_screen,
+        }
+        self.active_screen = None
+        self.show_screen("verification")
+
+        # Profile switches retune widget timers; in auto mode battery/CPU are re-checked periodically
+        performance.on_change(self.on_profile_changed)
+        performance.auto_tick()
+        self.power_timer = QTimer(self)
+        self.power_timer.timeout.connect(performance.auto_tick)
+        self.power_timer.start(config.PERFORMANCE_AUTO_CHECK_MS)
         
         self.voice_thread = None
         self.auth_thread = None
         self.auth_signals = None
+        self.presence = presence.get_state()
+        # In multi-process mode the face worker runs the presence checks
+        self.presence_monitor = None if config.MULTIPROCESS_MODE else presence.PresenceMonitor(self.presence)
         
         io.prefetch("Scanning biometric data")
         io.prefetch("Access denied")
         io.prefetch("Access granted")
         io.prefetch(f"Welcome back, {config.USER_NAME}.")
         
-        QTimer.singleShot(1500, self.start_authentication)
+        if not config.MULTIPROCESS_MODE:
+            # Measure background noise while the user is being verified, before the first listen()
+            self.executor.submit("calibrate", lambda task: io.calibrate())
+        QTimer.singleShot(300 if self.presence_recent() else 1500, self.start_authentication)
+        QTimer.singleShot(0, self.prebuild_screens)
     
     def setup_header(self):
         header = QWidget()
@@ -472,16 +669,40 @@ class BlazeMainWindow(QMainWindow):
         close_btn.mousePressEvent = lambda e: self.close()
         layout.addWidget(close_btn)
         self.main_layout.addWidget(header)
+
+    def add_screen(self, name, page):
+        page.park()
+        self.screens[name] = page
+        self.content_stack.addWidget(page)
+
+    def show_screen(self, name):
+        """Switches the stack to a pre-built screen, parking the previous one"""
+        if name not in self.screens:
+            # Prebuild has not reached this screen yet; build it now.
+            self.screen_builders[name]()
+        if self.active_screen == name:
+            return
+        if self.active_screen:
+            self.screens[self.active_screen].park()
+        page = self.screens[name]
+        self.content_stack.setCurrentWidget(page)
+        self.active_screen = name
+        page.resume()
+
+    def prebuild_screens(self):
+        """Constructs screens that are not built yet, one per event-loop pass"""
+        pending = [name for name in self.screen_builders if name not in self.screens]
+        if pending:
+            self.screen_builders[pending[0]]()
+        if len(pending) > 1:
+            QTimer.singleShot(0, self.prebuild_screens)
     
     def setup_verification_screen(self):
-        while self.content_layout.count():
-            item = self.content_layout.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
-        container = QWidget()
-        layout = QVBoxLayout(container)
+        page = ScreenPage()
+        layout = QVBoxLayout(page)
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.setSpacing(40)
-        self.face_widget = FaceVerificationWidget()
+        self.face_widget = page.track(FaceVerificationWidget())
         layout.addWidget(self.face_widget, alignment=Qt.AlignmentFlag.AlignCenter)
         self.status_label = QLabel("Initializing Security Protocols")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -493,9 +714,17 @@ class BlazeMainWindow(QMainWindow):
         self.progress_label.setFont(QFont("Helvetica", 14))
         self.progress_label.setStyleSheet("color: #666;")
         layout.addWidget(self.progress_label)
-        self.content_layout.addWidget(container)
+        self.add_screen("verification", page)
+
+    def presence_recent(self):
+        return config.PRESENCE_ENABLED and self.presence.valid()
 
     def start_authentication(self):
+        if self.presence_recent():
+            # Verified and seen within the presence window: skip the cold scan
+            metrics.incr("presence.scans_skipped")
+            self.grant_access("Presence Confirmed")
+            return
         self.update_status("SCANNING BIOMETRICS")
         self.face_widget.start_scan()
         
@@ -505,53 +734,72 @@ class BlazeMainWindow(QMainWindow):
         self.auth_signals.auth_result.connect(self.handle_auth_result)
         self.auth_signals.cam_update.connect(self.face_widget.update_image)
         
-        self.auth_thread = FaceAuthThread(self.auth_signals)
+        auth_thread_class = FaceAuthProcessThread if config.MULTIPROCESS_MODE else FaceAuthThread
+        self.auth_thread = auth_thread_class(self.auth_signals)
         self.auth_thread.start()
         
     def handle_auth_result(self, verified):
         self.face_widget.stop_scan()
         if verified:
-            self.face_widget.set_success()
-            self.update_status("ACCESS GRANTED")
-            self.update_progress("Identity Verified")
-            QTimer.singleShot(1000, self.play_boot_sequence)
+            if config.PRESENCE_ENABLED:
+                self.presence.verified()
+            self.grant_access("Identity Verified")
         else:
             self.update_status("ACCESS DENIED")
             self.update_progress("Intruder Detected")
             io.speak("Access denied.")
 
-    def play_boot_sequence(self):
-        while self.content_layout.count():
-            item = self.content_layout.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
-        self.boot_widget = BootSequenceWidget()
+    def grant_access(self, detail):
+        self.face_widget.set_success()
+        self.update_status("ACCESS GRANTED")
+        self.update_progress(detail)
+        if config.PRESENCE_ENABLED:
+            self.start_presence_checks()
+        QTimer.singleShot(1000, self.play_boot_sequence)
+
+    def start_presence_checks(self):
+        if self.presence_monitor is not None:
+            self.presence_monitor.start()
+        elif self.auth_thread is None:
+            # The scan was skipped: start a face worker that only runs presence checks.
+            # After a scan, the worker that did it carries on with them by itself.
+            self.auth_thread = FaceAuthProcessThread(None, scan=False)
+            self.auth_thread.start()
+
+    def setup_boot_screen(self):
+        page = ScreenPage()
+        layout = QVBoxLayout(page)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.boot_widget = page.track(BootSequenceWidget())
         self.boot_widget.finished.connect(self.on_boot_finished)
-        self.content_layout.addWidget(self.boot_widget)
+        layout.addWidget(self.boot_widget)
+        self.add_screen("boot", page)
+
+    def play_boot_sequence(self):
+        self.show_screen("boot")
 
     def on_boot_finished(self):
         io.speak(f"Welcome back, {config.USER_NAME}.")
-        self.setup_assistant_screen()
+        self.show_screen("assistant")
         self.start_voice_listening()
 
     def setup_assistant_screen(self):
-        while self.content_layout.count():
-            item = self.content_layout.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
+        page = ScreenPage()
         
         # --- HUD LAYOUT ---
-        main_hud = QVBoxLayout()
+        main_hud = QVBoxLayout(page)
         
         # Top Bar: Clock & Stats
         top_bar = QHBoxLayout()
-        self.clock = HUDClock()
-        self.sys_monitor = SystemMonitor()
+        self.clock = page.track(HUDClock())
+        self.sys_monitor = page.track(SystemMonitor())
         top_bar.addWidget(self.clock)
         top_bar.addStretch()
         top_bar.addWidget(self.sys_monitor)
         main_hud.addLayout(top_bar)
         
         # Center: Orb
-        self.orb = SiriOrb()
+        self.orb = page.track(SiriOrb())
         main_hud.addWidget(self.orb, alignment=Qt.AlignmentFlag.AlignCenter)
         
         # Bottom: Command Log
@@ -568,9 +816,7 @@ class BlazeMainWindow(QMainWindow):
         subtitle.setStyleSheet("color: #555;")
         main_hud.addWidget(subtitle)
 
-        container = QWidget()
-        container.setLayout(main_hud)
-        self.content_layout.addWidget(container)
+        self.add_screen("assistant", page)
     
     def update_status(self, text):
         if hasattr(self, 'status_label'): self.status_label.setText(text)
@@ -588,114 +834,247 @@ class BlazeMainWindow(QMainWindow):
         new_text = "\n".join(lines) + "\n> " + text
         self.command_log.setText(new_text.strip())
 
+    def on_profile_changed(self, name, settings):
+        for page in self.screens.values():
+            page.retune(settings)
+
+    def prefetch_when_idle(self):
+        """Pre-synthesises likely next responses while nothing is running or playing"""
+        if self._assistant_busy or io.is_speaking():
+            return
+        self.prefetcher.on_idle()
+
     def start_voice_listening(self):
         self.orb.set_state("listening")
-        self.voice_thread = VoiceThread()
+        self.idle_timer = QTimer(self)
+        self.idle_timer.timeout.connect(self.prefetch_when_idle)
+        self.idle_timer.start(config.PREFETCH_IDLE_INTERVAL_MS)
+        self.voice_thread = VoiceProcessThread() if config.MULTIPROCESS_MODE else VoiceThread()
         self.voice_thread.command_received.connect(self.process_command)
+        if config.MULTIPROCESS_MODE:
+            self.voice_thread.note_received.connect(self.save_note)
         self.voice_thread.start()
     
+    def register_intents(self):
+        """Built-in intents (see intents.BUILTIN_INTENTS), handled by the cmd_* methods"""
+        intents.register_builtins(self.router, self)
+
+    def is_duplicate(self, command):
+        """Drops repeat recognitions of one utterance and re-issues while its own task is still running"""
+        return self.repeats.is_duplicate(command)
+
+    def on_busy_changed(self, busy):
+        self._assistant_busy = busy
+
     def process_command(self, command):
         command = command.lower().strip()
         if not command or command == 'none':
             return
+        if self.is_duplicate(command):
+            metrics.incr("commands.duplicates_dropped")
+            metrics.incr("voice.wasted_recognitions", reason="duplicate")
+            return
         self.add_log(f"Processing: {command}")
         
-        if "blaze" in command:
+        if config.WAKE_WORD not in command:
+            metrics.incr("voice.no_wake_word")
+            metrics.incr("voice.wasted_recognitions", reason="no_wake_word")
+        else:
+            metrics.incr("commands.dispatched")
             self.orb.set_state("speaking")
-            
-            # --- SYSTEM COMMANDS ---
-            if "shutdown" in command:
-                io.speak("Are you sure you want to shut down?")
-                self.add_log("Shutting down...")
-                io.speak("Shutting down. Goodbye.")
-                QTimer.singleShot(2000, lambda: automation.shutdown_system())
-                QTimer.singleShot(2500, self.close)
-            
-            elif "restart" in command or "reboot" in command:
-                self.add_log("Restarting...")
-                io.speak("Restarting system.")
-                automation.restart_system()
-                QTimer.singleShot(1000, self.close)
-            
-            elif "sleep" in command:
-                io.speak("Going to sleep.")
-                automation.sleep_system()
-                QTimer.singleShot(1000, self.close)
-            
-            elif "stop" in command or "exit" in command:
-                io.speak("Goodbye.")
-                self.close()
-
-            # --- UTILITY COMMANDS ---
-            elif "open" in command:
-                app = command.replace("open", "").replace("blaze", "").strip()
-                self.add_log(f"Opening {app}")
-                automation.open_app(app)
-            
-            elif "search" in command:
-                query = command.replace("search", "").replace("blaze", "").strip()
-                self.add_log(f"Searching: {query}")
-                automation.search_google(query)
-            
-            elif "screenshot" in command:
-                self.add_log("Taking screenshot")
-                automation.take_screenshot()
-
-            # --- NEW FEATURES ---
-            elif "time" in command:
-                now = datetime.datetime.now().strftime("%I:%M %p")
-                self.add_log(f"Time: {now}")
-                io.speak(f"The time is {now}")
-
-            elif "date" in command:
-                today = datetime.datetime.now().strftime("%A, %B %d")
-                self.add_log(f"Date: {today}")
-                io.speak(f"Today is {today}")
-
-            elif "volume" in command:
-                # Basic Volume Control (Mac)
-                try:
-                    words = command.split()
-                    for word in words:
-                        if word.isdigit():
-                            vol = max(0, min(100, int(word)))
-                            vol = int(word)
-                            os.system(f"osascript -e 'set volume output volume {vol}'")
-                            self.add_log(f"Volume set to {vol}%")
-                            io.speak(f"Volume set to {vol} percent.")
-                            break
-                except:
-                    pass
-            
-            elif "mute" in command:
-                os.system("osascript -e 'set volume output muted true'")
-                self.add_log("System Muted")
-            
-            elif "unmute" in command:
-                os.system("osascript -e 'set volume output muted false'")
-                self.add_log("System Unmuted")
-
-            elif "note" in command or "write" in command:
-                io.speak("What should I write?")
-                # Quick listen for the note content
-                # Note: blocking call here is okay for short interactions
-                note_content = io.listen() 
-                if note_content != "none":
-                    with open("notes.txt", "a") as f:
-                        f.write(f"{datetime.datetime.now()}: {note_content}\n")
-                    self.add_log("Note saved.")
-                    io.speak("I've saved that note for you.")
-                else:
-                    io.speak("I didn't catch that.")
-
+            found = self.router.match(command, context=self)
+            if found:
+                # Learn before running, so the handler's speech is attributed to this intent
+                self.prefetcher.observe_intent(found.name, found.slots)
+            with tracing.span("command.dispatch") as span, self.executor.origin(command):
+                if found:
+                    found.intent.handler(found)
+                span.set(intent=found.name if found else None)
             QTimer.singleShot(2000, lambda: self.orb.set_state("listening"))
+
+    # --- BACKGROUND EXECUTION ---
+    def run_in_background(self, name, fn, *args, timeout=None, on_result=None):
+        """Runs a blocking helper (automation, shell, listen) on the command pool"""
+        return self.executor.submit(name, lambda task: fn(*args), timeout=timeout,
+                                    on_result=on_result)
+
+    def on_command_progress(self, task_id, name, text):
+        self.add_log(text)
+
+    def on_command_failed(self, task_id, name, error):
+        self.add_log(f"{name} failed: {error}")
+
+    def on_command_timed_out(self, task_id, name):
+        self.add_log(f"{name} timed out")
+
+    # --- INTENT HANDLERS ---
+    def cmd_shutdown(self, match):
+        self.add_log("Shutting down...")
+        io.speak("Shutting down. Say cancel to stop.")
+        self.executor.submit("shutdown", automation.shutdown_system, cancellable=True,
+                             on_result=lambda done: done and self.close())
+
+    def cmd_restart(self, match):
+        self.add_log("Restarting...")
+        io.speak("Restarting system.")
+        self.executor.submit("restart", automation.restart_system, cancellable=True,
+                             on_result=lambda done: done and self.close())
+
+    def cmd_sleep(self, match):
+        io.speak("Going to sleep.")
+        self.executor.submit("sleep", automation.sleep_system, cancellable=True,
+                             on_result=lambda done: done and self.close())
+
+    def cmd_exit(self, match):
+        io.speak("Goodbye.")
+        self.close()
+
+    def cmd_cancel(self, match):
+        count = self.executor.cancel_all()
+        self.add_log(f"Cancelled {count} running command(s)")
+        if count:
+            io.speak("Cancelled.")
+        elif self.executor.active():
+            io.speak("That can't be stopped now.")
+        else:
+            io.speak("Nothing to cancel.")
+
+    def cmd_open_app(self, match):
+        app = match.slots.get("app", match.slots.get("text", ""))
+        self.add_log(f"Opening {app}")
+        self.run_in_background("open_app", automation.open_app, app, timeout=10)
+
+    def cmd_search(self, match):
+        query = match.slots.get("query", match.slots.get("text", ""))
+        self.add_log(f"Searching: {query}")
+        self.run_in_background("search", automation.search_google, query, timeout=15)
+
+    def cmd_screenshot(self, match):
+        if "every" in match.slots:
+            interval = max(int(match.slots["every"]), 1)
+            self.add_log(f"Screenshot every {interval} s")
+            self.run_in_background("screenshot", automation.start_screenshot_interval, interval, timeout=10)
+            return
+        count = min(int(match.slots.get("count", 1)), 20)
+        if count > 1:
+            self.add_log(f"Taking {count} screenshots")
+            self.run_in_background("screenshot", automation.take_screenshot_burst, count, timeout=10)
+        else:
+            self.add_log("Taking screenshot")
+            self.run_in_background("screenshot", automation.take_screenshot, timeout=10)
+
+    def cmd_stop_screenshots(self, match):
+        self.add_log("Stopping screenshots")
+        self.run_in_background("screenshot", automation.stop_screenshots, timeout=10)
+
+    def cmd_time(self, match):
+        now = datetime.datetime.now()
+        self.add_log(f"Time: {now.strftime('%I:%M %p')}")
+        io.speak(prefetcher.time_response(now))
+
+    def cmd_date(self, match):
+        today = datetime.datetime.now()
+        self.add_log(f"Date: {today.strftime('%A, %B %d')}")
+        io.speak(prefetcher.date_response(today))
+
+    def cmd_volume(self, match):
+        if "number" not in match.slots:
+            return
+        vol = prefetcher.volume_level(match.slots["number"])
+        self.run_in_background("volume", automation.set_volume, vol)
+        self.add_log(f"Volume set to {vol}%")
+        io.speak(prefetcher.volume_response(vol))
+
+    def cmd_mute(self, match):
+        self.run_in_background("mute", automation.mute)
+        self.add_log("System Muted")
+
+    def cmd_unmute(self, match):
+        self.run_in_background("unmute", automation.unmute)
+        self.add_log("System Unmuted")
+
+    def cmd_power_mode(self, match):
+        spoken = match.slots.get("mode")
+        if spoken is None:
+            io.speak(f"Power mode is {performance.mode().replace('-', ' ')}.")
+            return
+        names = {"low": "low-power", "balanced": "balanced", "auto": performance.AUTO,
+                 "automatic": performance.AUTO}
+        name = names.get(spoken.split()[0], "max-responsiveness")
+        performance.set_mode(name)
+        label = performance.active().replace("-", " ")
+        if name == performance.AUTO:
+            io.speak(f"Automatic power mode. Currently {label}.")
+        else:
+            io.speak(f"Switched to {label} mode")
+        self.add_log(f"Profile: {performance.active()} ({performance.mode()})")
+
+    def cmd_note(self, match):
+        io.speak("What should I write?")
+        if config.MULTIPROCESS_MODE:
+            # The capture worker owns the microphone; the dictation arrives as note_received
+            self.voice_thread.request_note()
+            return
+        # Listening for the note content blocks for up to 10 s, so it runs on the pool
+        self.executor.submit("note", self.listen_for_note, timeout=15, cancellable=True,
+                             on_result=self.save_note)
+
+    def listen_for_note(self, task):
+        task.report("Listening for note...")
+        # Keep the wake-word loop off the microphone while the note is dictated
+        if self.voice_thread:
+            self.voice_thread.paused = True
+        try:
+            note_content = io.listen()
+        finally:
+            if self.voice_thread:
+                self.voice_thread.paused = False
+        task.check()
+        return note_content
+
+    def save_note(self, note_content):
+        if note_content != "none":
+            notes_store.get_store().add(note_content)
+            self.add_log("Note saved.")
+            io.speak("I've saved that note for you.")
+        else:
+            io.speak("I didn't catch that.")
             
+    def cmd_find_note(self, match):
+        query = match.slots["query"]
+        self.add_log(f"Finding notes: {query}")
+        self.run_in_background("find_note", lambda: notes_store.get_store().search(query, limit=3),
+                               on_result=lambda notes: self.speak_notes(notes, f"about {query}"))
+
+    def cmd_read_notes(self, match):
+        self.add_log("Reading today's notes")
+        self.run_in_background("read_notes", lambda: notes_store.get_store().today(limit=5),
+                               on_result=lambda notes: self.speak_notes(notes, "from today"))
+
+    def speak_notes(self, notes, description):
+        if not notes:
+            io.speak(f"I couldn't find any notes {description}.")
+            return
+        for created, body in notes:
+            self.add_log(f"Note {created.strftime('%b %d %H:%M')}: {body}")
+        spoken = ". ".join(body for _, body in notes)
+        io.speak(f"I found {len(notes)} notes {description}. {spoken}" if len(notes) > 1
+                 else f"Your note {description} says: {spoken}")
+
     def closeEvent(self, event):
-        if hasattr(self, 'orb') and self.orb: self.orb.timer.stop()
-        if hasattr(self, 'face_widget') and self.face_widget: self.face_widget.timer.stop()
-        if hasattr(self, 'boot_widget') and self.boot_widget: self.boot_widget.timer.stop()
-        if hasattr(self, 'sys_monitor') and self.sys_monitor: self.sys_monitor.timer.stop()
-        if hasattr(self, 'clock') and self.clock: self.clock.timer.stop()
+        for page in self.screens.values():
+            page.park()
+        self.executor.shutdown(wait=False)
+        if self.presence_monitor is not None:
+            self.presence_monitor.stop(timeout=0.5)
+        if isinstance(self.auth_thread, FaceAuthProcessThread) and self.auth_thread.isRunning():
+            self.auth_thread.stop()
+            self.auth_thread.wait(1000)
+        if notes_store._store is not None:
+            notes_store._store.flush()
+        self.prefetcher.save()
+        self.prefetcher.publish_stats()
+        metrics.report()
         
         if self.voice_thread and self.voice_thread.isRunning():
             self.voice_thread.stop()
@@ -0,0 +1,238 @@
+# command_executor.py
+import threading
+import itertools
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class CommandCancelled(Exception):
+    """Raised inside a task by check() once it has been cancelled or has timed out"""
+
+
+class CommandTask:
+    """
+    Handle passed to every job. Cancellable jobs should call check() or wait()
+    between steps, and commit() right before an action that cannot be undone.
+    """
+    PENDING, RUNNING, DONE, FAILED, CANCELLED, TIMED_OUT = (
+        "pending", "running", "done", "failed", "cancelled", "timed_out")
+
+    def __init__(self, task_id, name, executor, timeout, cancellable=False, command=None):
+        self.id = task_id
+        self.name = name
+        # The spoken command whose handler submitted this task, if any
+        self.command = command
+        self.timeout = timeout
+        self.cancellable = cancellable
+        self.committed = False
+        self.state = self.PENDING
+        self.cancel_event = threading.Event()
+        self._executor = executor
+        self._timer = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise CommandCancelled(self.name)
+
+    def report(self, text):
+        """Sends a progress message to the GUI thread"""
+        if not self.cancelled:
+            self._executor.progress.emit(self.id, self.name, text)
+
+    def wait(self, seconds):
+        """Cancellation-aware replacement for time.sleep(). Returns False if cancelled."""
+        return not self.cancel_event.wait(seconds)
+
+    def commit(self):
+        """
+        Marks the point of no return. Returns False if the task was already
+        cancelled (the job must stop); after it returns True, cancel() fails.
+        """
+        with self._executor._lock:
+            if self.cancel_event.is_set():
+                return False
+            self.committed = True
+            return True
+
+
+class CommandExecutor(QObject):
+    """
+    Runs command jobs on a worker pool so the GUI thread never blocks.
+    Results, errors, progress and timeouts come back as Qt signals, which are
+    delivered on the thread that owns the executor (the GUI thread).
+
+    Python threads cannot be killed: cancelling or timing out a task only sets
+    its cancel event and drops its result. A job that never calls check() or
+    wait() (a hung pywhatkit call, say) keeps its worker until it returns.
+    Such stuck workers are counted, and submissions are rejected while every
+    worker is stuck.
+    """
+    started = pyqtSignal(int, str)
+    progress = pyqtSignal(int, str, str)
+    finished = pyqtSignal(int, str, object)
+    failed = pyqtSignal(int, str, str)
+    cancelled = pyqtSignal(int, str)
+    timed_out = pyqtSignal(int, str)
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, max_workers=3, default_timeout=30.0, parent=None):
+        super().__init__(parent)
+        self.default_timeout = default_timeout
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blaze-cmd")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._tasks = {}
+        self._callbacks = {}
+        # Ids of timed-out tasks whose job has not returned yet
+        self._stuck = set()
+        # Command being dispatched on the GUI thread (see origin())
+        self._origin = None
+        self.finished.connect(self._on_finished)
+        self.failed.connect(self._on_failed)
+
+    # --- Submission ---
+    @contextlib.contextmanager
+    def origin(self, command):
+        """Tags every task submitted inside the block with the command that caused it"""
+        self._origin = command
+        try:
+            yield
+        finally:
+            self._origin = None
+
+    def submit(self, name, fn, *args, timeout=None, on_result=None, on_error=None,
+               cancellable=False, **kwargs):
+        """
+        Queues fn(task, *args, **kwargs). on_result/on_error run on the GUI thread.
+        Pass cancellable=True only for jobs that call check()/wait(), so that
+        cancel() never claims to stop work that keeps running.
+        Returns the CommandTask handle.
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        task = CommandTask(next(self._ids), name, self, timeout, cancellable, self._origin)
+        with self._lock:
+            stuck = len(self._stuck) >= self.max_workers
+            if not stuck:
+                self._tasks[task.id] = task
+                self._callbacks[task.id] = (on_result, on_error)
+                if len(self._tasks) == 1:
+                    self.busy_changed.emit(True)
+        if stuck:
+            task.state = CommandTask.FAILED
+            error = "all workers are stuck on timed-out commands"
+            self.failed.emit(task.id, name, error)
+            if on_error:
+                on_error(error)
+            return task
+        self._pool.submit(self._run, task, fn, args, kwargs)
+        return task
+
+    def _run(self, task, fn, args, kwargs):
+        if task.cancelled:
+            self._settle(task, CommandTask.CANCELLED)
+            return
+        task.state = CommandTask.RUNNING
+        if task.timeout:
+            task._timer = threading.Timer(task.timeout, self._expire, args=(task,))
+            task._timer.daemon = True
+            task._timer.start()
+        self.started.emit(task.id, task.name)
+
+        try:
+            result = fn(task, *args, **kwargs)
+        except CommandCancelled:
+            self._settle(task, CommandTask.CANCELLED)
+        except Exception as e:
+            if self._settle(task, CommandTask.FAILED):
+                self.failed.emit(task.id, task.name, str(e))
+        else:
+            if self._settle(task, CommandTask.DONE):
+                self.finished.emit(task.id, task.name, result)
+        finally:
+            with self._lock:
+                self._stuck.discard(task.id)
+
+    def _expire(self, task):
+        with self._lock:
+            # Still running: its worker stays busy until the job returns
+            if task.id in self._tasks:
+                self._stuck.add(task.id)
+        if self._settle(task, CommandTask.TIMED_OUT):
+            task.cancel_event.set()
+
+    def _settle(self, task, state):
+        """Moves a task to its final state once. Returns False if it already ended."""
+        with self._lock:
+            if task.id not in self._tasks:
+                return False
+            del self._tasks[task.id]
+            if state not in (CommandTask.DONE, CommandTask.FAILED):
+                self._callbacks.pop(task.id, None)
+            idle = not self._tasks
+        task.state = state
+        if task._timer:
+            task._timer.cancel()
+        if state == CommandTask.CANCELLED:
+            self.cancelled.emit(task.id, task.name)
+        elif state == CommandTask.TIMED_OUT:
+            self.timed_out.emit(task.id, task.name)
+        if idle:
+            self.busy_changed.emit(False)
+        return True
+
+    # --- GUI-thread callbacks ---
+    def _on_finished(self, task_id, name, result):
+        on_result, _ = self._callbacks.pop(task_id, (None, None))
+        if on_result:
+            on_result(result)
+
+    def _on_failed(self, task_id, name, error):
+        _, on_error = self._callbacks.pop(task_id, (None, None))
+        if on_error:
+            on_error(error)
+
+    # --- Control ---
+    def cancel(self, task_id):
+        """Stops a cancellable task that has not committed. Returns True if it was stopped."""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or not task.cancellable or task.committed:
+                return False
+            task.cancel_event.set()
+        # The job stops at its next check()/wait(); its result is dropped
+        return self._settle(task, CommandTask.CANCELLED)
+
+    def cancel_all(self):
+        with self._lock:
+            ids = list(self._tasks)
+        return sum(1 for task_id in ids if self.cancel(task_id))
+
+    def active(self):
+        with self._lock:
+            return [(task.id, task.name, task.state) for task in self._tasks.values()]
+
+    def running(self, command):
+        """True if a task submitted for this command has not ended yet"""
+        with self._lock:
+            return any(task.command == command for task in self._tasks.values())
+
+    def stuck(self):
+        """Number of workers still running a timed-out job"""
+        with self._lock:
+            return len(self._stuck)
+
+    def shutdown(self, wait=False):
+        # Drop every pending result, cancellable or not
+        with self._lock:
+            tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel_event.set()
+            self._settle(task, CommandTask.CANCELLED)
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -3,4 +3,111 @@ ASSISTANT_NAME = "Blaze"
 WAKE_WORD = "blaze"
 USER_NAME = "Sir"
 # Replace with the actual path to your photo for facial login
-USER_PHOTO_PATH = "my_face.jpg"
\ No newline at end of file
+USER_PHOTO_PATH = "my_face.jpg"
+
+# Automation backend: "auto" (by platform), "mac", "linux" or "fake"
+AUTOMATION_BACKEND = "auto"
+# Seconds to wait for the automation helper's reply before restarting it
+AUTOMATION_REPLY_TIMEOUT = 5.0
+# Seconds between announcing shutdown/restart/sleep and doing it; "blaze cancel" stops it
+SYSTEM_ACTION_GRACE_SECONDS = 5
+
+# Notes: SQLite store, plus the legacy text file imported on first run
+NOTES_DB_PATH = "notes.db"
+NOTES_LEGACY_PATH = "notes.txt"
+
+# Screenshots: timestamped files, encoded off-thread. Format is png, jpg or webp.
+SCREENSHOT_DIR = "screenshots"
+SCREENSHOT_FORMAT = "png"
+SCREENSHOT_COMPRESS_LEVEL = 3   # PNG zlib level 0-9 (lower is faster)
+SCREENSHOT_QUALITY = 85         # JPEG/WebP quality
+SCREENSHOT_MAX_PENDING = 8      # Frames waiting to be encoded before new ones are dropped
+
+# Latency tracing: spans go to a rotating JSONL file (see `python tracing.py summary`)
+TRACE_ENABLED = True
+TRACE_PATH = "traces/blaze_trace.jsonl"
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 3
+
+# Voice pipeline: self-speech suppression and duplicate command filtering
+ECHO_TAIL_SECONDS = 0.6         # Room echo after our own playback ends
+ECHO_SIMILARITY = 0.75          # Share of heard words found in what we were saying
+COMMAND_DEDUPE_SECONDS = 3.0    # Identical commands inside this window are dropped
+
+# Predictive TTS prefetch: learned intent history and how often idle prefetch runs
+PREFETCH_HISTORY_PATH = "prefetch_history.json"
+PREFETCH_IDLE_INTERVAL_MS = 20000
+PREFETCH_IDLE_BUDGET = 4  # Most phrases synthesised per idle tick
+
+# Performance profiles: every runtime tunable in one place.
+# PERFORMANCE_PROFILE is a profile name or "auto" (picked from battery and CPU load via psutil).
+PERFORMANCE_PROFILE = "auto"
+PERFORMANCE_AUTO_CHECK_MS = 30000
+PERFORMANCE_PROFILES = {
+    "low-power": {
+        "energy_threshold": 450,        # Minimum mic level that counts as speech (calibration can raise it)
+        "listen_timeout": 5,            # Seconds to wait for speech to start
+        "phrase_time_limit": 5,         # Max seconds of one utterance
+        "face_scale_factor": 1.3,       # Haar cascade pyramid step (bigger is faster)
+        "face_min_neighbors": 5,
+        "capture_width": 320,
+        "capture_height": 240,
+        "animation_interval_ms": 50,    # Orb and face scan frame timers (the boot sequence has its own)
+        "stats_interval_ms": 5000,      # CPU/RAM monitor refresh
+    },
+    "balanced": {
+        "energy_threshold": 400,
+        "listen_timeout": 5,
+        "phrase_time_limit": 5,
+        "face_scale_factor": 1.2,
+        "face_min_neighbors": 5,
+        "capture_width": 640,
+        "capture_height": 480,
+        "animation_interval_ms": 24,
+        "stats_interval_ms": 2000,
+    },
+    "max-responsiveness": {
+        "energy_threshold": 350,
+        "listen_timeout": 3,
+        "phrase_time_limit": 5,
+        "face_scale_factor": 1.1,
+        "face_min_neighbors": 4,
+        "capture_width": 640,
+        "capture_height": 480,
+        "animation_interval_ms": 16,
+        "stats_interval_ms": 1000,
+    },
+}
+# Auto mode thresholds
+PERFORMANCE_LOW_BATTERY_PERCENT = 30
+PERFORMANCE_HIGH_CPU_PERCENT = 80
+
+# --- Multi-process mode ---
+# Run face auth and audio capture/recognition in worker processes. Camera previews
+# and captured audio cross to the GUI process through shared-memory ring buffers.
+MULTIPROCESS_MODE = False
+MULTIPROCESS_RING_SLOTS = 4
+MULTIPROCESS_FRAME_SLOT_BYTES = 2 * 1024 * 1024  # One RGB preview frame
+MULTIPROCESS_AUDIO_SLOT_BYTES = 2 * 1024 * 1024  # One utterance of raw PCM
+
+# --- Voice bank ---
+# Cached phrases packed as pre-decoded PCM in one memory-mapped file
+# (rebuild with: python voice_bank.py compact)
+VOICE_BANK_ENABLED = True
+VOICE_BANK_PATH = "voice_cache/voice_bank.pcm"
+VOICE_BANK_SAMPLE_RATE = 24000  # edge-tts output rate
+
+# --- Re-authentication ---
+# A successful face scan trusts the user's presence for PRESENCE_WINDOW_SECONDS.
+# Relaunches inside the window skip the scan; background checks extend it while
+# the user is in front of the camera. Set the window to 0 to always scan.
+PRESENCE_ENABLED = True
+PRESENCE_WINDOW_SECONDS = 120
+PRESENCE_CHECK_INTERVAL_MS = 2000  # One frame per check
+PRESENCE_MAX_MISSES = 3  # Consecutive checks seeing only unrecognised faces before the window closes
+# False opens the camera for each check: slower checks, but the camera (and its
+# light) is free between them. True keeps it open for the whole session.
+PRESENCE_KEEP_CAMERA_OPEN = False
+PRESENCE_CAPTURE_WIDTH = 320
+PRESENCE_CAPTURE_HEIGHT = 240
+PRESENCE_STATE_PATH = "user_data/presence.json"
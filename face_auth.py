@@ -2,28 +2,69 @@ import cv2
 import os
 import numpy as np
 import time
+import tracing
+import performance
 
 # File paths
 trainer_file = "user_data/trainer.yml"
 dataset_path = "user_data"
 
+# LBPH model, loaded on first use (see load_model)
+_model = None
+
 # Initialize Face Detector
 face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
 
 def is_user_registered():
     return os.path.exists(trainer_file)
 
+def load_model():
+    """The trained LBPH recogniser, loaded once and kept warm for later checks"""
+    global _model
+    if _model is None:
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        with tracing.span("face_auth.load_model"):
+            recognizer.read(trainer_file)
+        _model = recognizer
+    return _model
+
+def detect_faces(gray):
+    """Face boxes (x, y, w, h) in a grayscale frame"""
+    # Keep the minimum face size proportional to the profile's capture width
+    min_side = max(40, int(100 * gray.shape[1] / 640))
+    return face_cascade.detectMultiScale(gray, scaleFactor=performance.get("face_scale_factor"),
+                                         minNeighbors=performance.get("face_min_neighbors"),
+                                         minSize=(min_side, min_side))
+
+def matches_user(recognizer, gray, faces):
+    """True if any detected face matches the trained user"""
+    for (x, y, w, h) in faces:
+        id_num, confidence = recognizer.predict(gray[y:y+h, x:x+w])
+        
+        # LBPH Confidence: < 85 is a match (Lower is better)
+        if confidence < 85: 
+            return True
+    return False
+
+def preview_rgb(frame, target_size=400):
+    """Scales a BGR camera frame to cover target_size x target_size and converts it to RGB"""
+    h, w = frame.shape[:2]
+    scale = max(target_size / w, target_size / h)
+    resized_frame = cv2.resize(frame, (int(w * scale), int(h * scale)))
+    return cv2.cvtColor(resized_frame, cv2.COLOR_BGR2RGB)
+
 def capture_and_train_qt(signals):
     """
     Captures user face using OpenCV and trains the LBPH model.
     """
+    global _model
     if not os.path.exists(dataset_path):
         os.makedirs(dataset_path)
 
     recognizer = cv2.face.LBPHFaceRecognizer_create()
     cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, performance.get("capture_width"))
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, performance.get("capture_height"))
 
     faces_data = []
     ids = []
@@ -39,7 +80,7 @@ def capture_and_train_qt(signals):
 
         signals.update_camera_frame(frame)
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5, minSize=(100, 100))
+        faces = detect_faces(gray)
 
         for (x, y, w, h) in faces:
             faces_data.append(gray[y:y+h, x:x+w])
@@ -58,8 +99,10 @@ def capture_and_train_qt(signals):
     
     if len(faces_data) > 0:
         signals.update_status("COMPUTING NEURAL MAP...")
-        recognizer.train(faces_data, np.array(ids))
-        recognizer.save(trainer_file)
+        with tracing.span("face_auth.train", samples=len(faces_data)):
+            recognizer.train(faces_data, np.array(ids))
+            recognizer.save(trainer_file)
+        _model = recognizer
         return True
         
     return False
@@ -72,46 +115,65 @@ def verify_user_qt(signals):
         return False
 
     signals.update_status("LOADING BIOMETRICS...")
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
     try:
-        recognizer.read(trainer_file)
+        recognizer = load_model()
     except:
         return False
 
-    cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    with tracing.span("face_auth.camera_open"):
+        cap = cv2.VideoCapture(0)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, performance.get("capture_width"))
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, performance.get("capture_height"))
 
+    frames = 0
     verified = False
     start_time = time.time() # Start timer
     timeout_seconds = 8      # Stop scanning after 8 seconds
 
     signals.update_status("SCANNING...")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            continue
+    with tracing.span("face_auth.scan") as scan:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                continue
 
-        signals.update_camera_frame(frame)
+            signals.update_camera_frame(frame)
+            frames += 1
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5, minSize=(100, 100))
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = detect_faces(gray)
 
-        for (x, y, w, h) in faces:
-            id_num, confidence = recognizer.predict(gray[y:y+h, x:x+w])
-            
-            # LBPH Confidence: < 85 is a match (Lower is better)
-            if confidence < 85: 
+            if matches_user(recognizer, gray, faces):
                 verified = True
-                break 
-        
-        if verified:
-            break
+                break
 
-        # TIMEOUT CHECK: If 8 seconds pass, give up.
-        if time.time() - start_time > timeout_seconds:
-            break
+            # TIMEOUT CHECK: If 8 seconds pass, give up.
+            if time.time() - start_time > timeout_seconds:
+                break
+        scan.set(frames=frames, verified=verified)
 
     cap.release()
-    return verified
\ No newline at end of file
+    return verified
+
+def authenticate(signals, speak):
+    """
+    Registers a new user or verifies the registered one. Returns True on success.
+    `signals` reports status/progress/frames; `speak` voices the prompts.
+    """
+    if not is_user_registered():
+        signals.update_status("UNKNOWN ENTITY")
+        signals.update_progress("ALIGN FACE FOR CAPTURE")
+        speak("Identity not found. Starting registration.")
+        success = capture_and_train_qt(signals)
+        if success:
+            signals.update_status("REGISTRATION COMPLETE")
+            speak("Registration successful.")
+        else:
+            signals.update_status("REGISTRATION FAILED")
+        return success
+
+    signals.update_status("BIOMETRIC SCAN")
+    signals.update_progress("Scanning...")
+    speak("Scanning biometric data")
+    return verify_user_qt(signals)
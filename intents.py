@@ -0,0 +1,271 @@
+# intents.py
+import re
+import os
+import time
+import importlib.util
+
+# --- 1. Matching Primitives ---
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+NUMBER_RE = re.compile(r"^\d+$")
+
+
+def tokenize(text):
+    """Lower-cases a command and splits it into whole-word tokens"""
+    return TOKEN_RE.findall(text.lower())
+
+
+class Intent:
+    """A named command. Matches on whole-word keywords (or phrases) and/or regex patterns."""
+    def __init__(self, name, handler, keywords=(), patterns=(), priority=0, require_pattern=False):
+        self.name = name
+        self.handler = handler
+        self.keywords = [tuple(tokenize(k)) for k in keywords]
+        self.patterns = [re.compile(p) if isinstance(p, str) else p for p in patterns]
+        self.priority = priority
+        # Keyword intents normally fall back to generic slots when no pattern matches
+        self.require_pattern = require_pattern or not self.keywords
+        self.order = 0
+
+    def keyword_hit(self, tokens, positions):
+        """Returns the matched keyword phrase, checking only phrases whose first word is present"""
+        for phrase in self.keywords:
+            for start in positions.get(phrase[0], ()):
+                if tuple(tokens[start:start + len(phrase)]) == phrase:
+                    return phrase
+        return None
+
+
+class IntentMatch:
+    """Result of a dispatch: the winning intent plus extracted slots"""
+    def __init__(self, intent, command, slots, context=None):
+        self.intent = intent
+        self.command = command
+        self.slots = slots
+        self.context = context
+
+    @property
+    def name(self):
+        return self.intent.name
+
+    def __repr__(self):
+        return f"IntentMatch({self.intent.name!r}, slots={self.slots!r})"
+
+
+# --- 2. Router ---
+class IntentRouter:
+    """
+    Keyword-indexed intent dispatch.
+    Every keyword's first token maps to the intents that use it, so a command is
+    resolved by walking its own tokens once instead of testing every intent.
+    """
+    def __init__(self, stop_words=()):
+        self.intents = {}
+        self.stop_words = set(stop_words)
+        self._index = {}
+        self._pattern_only = []
+        self._dirty = True
+        self._counter = 0
+
+    def register(self, name, handler, keywords=(), patterns=(), priority=0, require_pattern=False):
+        """Adds an intent, replacing any existing intent with the same name"""
+        intent = Intent(name, handler, keywords, patterns, priority, require_pattern)
+        if not intent.keywords and not intent.patterns:
+            raise ValueError(f"Intent '{name}' needs at least one keyword or pattern")
+        self._counter += 1
+        intent.order = self._counter
+        self.intents[name] = intent
+        self._dirty = True
+        return intent
+
+    def unregister(self, name):
+        if self.intents.pop(name, None) is not None:
+            self._dirty = True
+
+    def intent(self, name, keywords=(), patterns=(), priority=0, require_pattern=False):
+        """Decorator form of register()"""
+        def decorator(handler):
+            self.register(name, handler, keywords, patterns, priority, require_pattern)
+            return handler
+        return decorator
+
+    def compile(self):
+        """Rebuilds the token index. Called lazily on the first dispatch after a change."""
+        index = {}
+        pattern_only = []
+        for intent in self.intents.values():
+            for phrase in intent.keywords:
+                bucket = index.setdefault(phrase[0], [])
+                if intent not in bucket:
+                    bucket.append(intent)
+            if not intent.keywords:
+                pattern_only.append(intent)
+        self._index = index
+        self._pattern_only = pattern_only
+        self._dirty = False
+
+    def match(self, command, context=None):
+        """Returns the best IntentMatch for the command, or None"""
+        if self._dirty:
+            self.compile()
+
+        tokens = tokenize(command)
+        positions = {}
+        candidates = {}
+        for i, token in enumerate(tokens):
+            positions.setdefault(token, []).append(i)
+            for intent in self._index.get(token, ()):
+                candidates[intent.name] = intent
+        for intent in self._pattern_only:
+            candidates[intent.name] = intent
+
+        ranked = sorted(candidates.values(), key=lambda it: (-it.priority, it.order))
+        for intent in ranked:
+            matched_phrase = None
+            if intent.keywords:
+                matched_phrase = intent.keyword_hit(tokens, positions)
+                if matched_phrase is None:
+                    continue
+
+            groups = None
+            if intent.patterns:
+                for pattern in intent.patterns:
+                    found = pattern.search(command)
+                    if found:
+                        groups = {k: self.strip_stop_words(v) for k, v in found.groupdict().items() if v}
+                        break
+                if groups is None and intent.require_pattern:
+                    continue
+
+            slots = self.extract_slots(tokens, matched_phrase)
+            if groups:
+                slots.update(groups)
+            return IntentMatch(intent, command, slots, context)
+        return None
+
+    def extract_slots(self, tokens, matched_phrase=None):
+        """Generic slots: the first number and the text left after removing the keyword"""
+        slots = {}
+        numbers = [int(t) for t in tokens if NUMBER_RE.match(t)]
+        if numbers:
+            slots["number"] = numbers[0]
+
+        rest = list(tokens)
+        if matched_phrase:
+            for i in range(len(rest) - len(matched_phrase) + 1):
+                if tuple(rest[i:i + len(matched_phrase)]) == matched_phrase:
+                    del rest[i:i + len(matched_phrase)]
+                    break
+        rest = [t for t in rest if t not in self.stop_words]
+        if rest:
+            slots["text"] = " ".join(rest)
+        return slots
+
+    def strip_stop_words(self, text):
+        return " ".join(word for word in text.split() if word not in self.stop_words)
+
+    def dispatch(self, command, context=None):
+        """Matches and runs the handler. Returns the IntentMatch, or None if nothing matched."""
+        found = self.match(command, context)
+        if found:
+            found.intent.handler(found)
+        return found
+
+
+# --- 3. Built-in Intents ---
+# (name, registration options). The handler for "name" is handlers.cmd_<name>.
+# Registration order breaks ties, highest priority first.
+BUILTIN_INTENTS = [
+    # System commands
+    ("shutdown", dict(keywords=["shutdown", "shut down"])),
+    ("restart", dict(keywords=["restart", "reboot"])),
+    ("sleep", dict(keywords=["sleep"])),
+    ("exit", dict(keywords=["stop", "exit"])),
+    ("cancel", dict(keywords=["cancel", "never mind"], priority=1)),
+    # Utility commands
+    ("open_app", dict(keywords=["open"], patterns=[r"\bopen\s+(?P<app>.+)"])),
+    ("search", dict(keywords=["search"],
+                    patterns=[r"\bsearch\s+(?:google\s+)?(?:for\s+)?(?P<query>.+)"])),
+    ("screenshot", dict(keywords=["screenshot", "screenshots", "screen shot"],
+                        patterns=[r"\bevery\s+(?P<every>\d+)\s+seconds?\b",
+                                  r"\b(?P<count>\d+)\s+(?:screenshots|screen shots)\b"])),
+    ("stop_screenshots", dict(keywords=["stop screenshots", "stop taking screenshots",
+                                        "stop the screenshots"], priority=1)),
+    # Features
+    ("time", dict(keywords=["time"])),
+    ("date", dict(keywords=["date"])),
+    ("volume", dict(keywords=["volume"])),
+    ("mute", dict(keywords=["mute"])),
+    ("unmute", dict(keywords=["unmute"])),
+    ("note", dict(keywords=["note", "write"])),
+    ("find_note", dict(keywords=["note", "notes"], priority=1, require_pattern=True,
+                       patterns=[r"\b(?:find|search|look up)\s+(?:for\s+)?(?:my\s+)?notes?\s+"
+                                 r"(?:about|for|on|with)\s+(?P<query>.+)"])),
+    ("read_notes", dict(keywords=["today's notes", "todays notes", "notes from today", "notes for today"],
+                        priority=1)),
+    ("power_mode", dict(keywords=["power mode", "low power", "balanced mode", "performance mode",
+                                  "max responsiveness", "auto mode", "automatic mode"], priority=1,
+                        patterns=[r"\b(?P<mode>low power|balanced|performance|max(?:imum)? responsiveness|"
+                                  r"auto(?:matic)?)\b"])),
+]
+
+
+def register_builtins(target_router, handlers):
+    """Registers BUILTIN_INTENTS on target_router, bound to handlers.cmd_<name>"""
+    for name, options in BUILTIN_INTENTS:
+        target_router.register(name, getattr(handlers, f"cmd_{name}"), **options)
+
+
+# --- 4. Repeat Suppression ---
+class RepeatFilter:
+    """
+    Drops a command identical to the previous one if it arrives within `window`
+    seconds (two recognitions of one utterance), or while running(command) says
+    the work it started is still going. Unrelated work does not block a repeat.
+    """
+    def __init__(self, window, running=None):
+        self.window = window
+        self.running = running or (lambda command: False)
+        self.last = None
+        self.last_time = 0.0
+
+    def is_duplicate(self, command, now=None):
+        now = time.time() if now is None else now
+        if command == self.last and (now - self.last_time < self.window or self.running(command)):
+            return True
+        self.last = command
+        self.last_time = now
+        return False
+
+
+# --- 5. Default Registry & Plugins ---
+router = IntentRouter()
+
+
+def register(name, handler, keywords=(), patterns=(), priority=0, require_pattern=False):
+    """Registers an intent on the shared router (for plugins)"""
+    return router.register(name, handler, keywords, patterns, priority, require_pattern)
+
+
+def intent(name, keywords=(), patterns=(), priority=0, require_pattern=False):
+    """Decorator that registers an intent on the shared router (for plugins)"""
+    return router.intent(name, keywords, patterns, priority, require_pattern)
+
+
+def load_plugins(directory="plugins"):
+    """Imports every .py file in the plugin directory so it can register intents"""
+    loaded = []
+    if not os.path.isdir(directory):
+        return loaded
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".py") or filename.startswith("_"):
+            continue
+        path = os.path.join(directory, filename)
+        module_name = f"blaze_plugin_{filename[:-3]}"
+        try:
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            loaded.append(module_name)
+        except Exception as e:
+            print(f"Plugin Error ({filename}): {e}")
+    return loaded
@@ -0,0 +1,61 @@
+# metrics.py
+"""
+Process-wide counters and gauges.
+
+Counters are cheap (a lock and a dict update) so they can be bumped on hot
+paths. Each increment is also recorded as a tracing mark, so the trace
+summary shows how often an event happened alongside stage latencies.
+"""
+import threading
+
+import tracing
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+
+
+def incr(name, amount=1, **attrs):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+    tracing.mark(f"metric.{name}", **attrs)
+
+
+def gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def get(name, default=0):
+    with _lock:
+        return _counters.get(name, _gauges.get(name, default))
+
+
+def snapshot():
+    with _lock:
+        merged = dict(_gauges)
+        merged.update(_counters)
+        return merged
+
+
+def ratio(numerator, denominator):
+    """numerator / denominator counters, or 0.0 before anything was counted"""
+    with _lock:
+        total = _counters.get(denominator, 0)
+        return _counters.get(numerator, 0) / total if total else 0.0
+
+
+def report():
+    values = snapshot()
+    if not values:
+        return
+    print("--- Metrics ---")
+    for name in sorted(values):
+        value = values[name]
+        print(f"{name:<36}{value:.3f}" if isinstance(value, float) else f"{name:<36}{value}")
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
@@ -0,0 +1,188 @@
+# notes_store.py
+"""
+Voice notes backed by SQLite.
+
+Notes live in a plain table with a per-day index; an FTS5 index (when the
+SQLite build has it) answers "find my note about X" without scanning.
+Writes are buffered and committed in batches on a short timer.
+"""
+import os
+import re
+import sqlite3
+import datetime
+import threading
+
+import config
+
+WORD_RE = re.compile(r"[\w']+")
+# Filler words in spoken queries; matching on them would return unrelated notes
+STOP_WORDS = {
+    "a", "an", "the", "my", "me", "i", "to", "of", "for", "about", "on", "in", "at",
+    "with", "and", "or", "is", "was", "it", "that", "this", "what", "did", "do", "any",
+    "some", "note", "notes",
+}
+LEGACY_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?): ?(.*)$")
+
+
+class NotesStore:
+    def __init__(self, path=None, batch_size=32, flush_delay=2.0):
+        self.path = path or config.NOTES_DB_PATH
+        self.batch_size = batch_size
+        self.flush_delay = flush_delay
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._pending = []
+        self._timer = None
+        self.has_fts = self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS notes ("
+                "id INTEGER PRIMARY KEY, created REAL NOT NULL, day TEXT NOT NULL, body TEXT NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS notes_day ON notes(day, created)")
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts "
+                    "USING fts5(body, content='notes', content_rowid='id')")
+            except sqlite3.OperationalError:
+                print("Notes: FTS5 unavailable, falling back to LIKE search")
+                return False
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN "
+                "INSERT INTO notes_fts(rowid, body) VALUES (new.id, new.body); END")
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN "
+                "INSERT INTO notes_fts(notes_fts, rowid, body) VALUES ('delete', old.id, old.body); END")
+        return True
+
+    # --- Writes ---
+    def add(self, body, created=None):
+        """Queues a note. It is committed with the next batch (size or timer)."""
+        body = body.strip()
+        if not body:
+            return
+        created = created or datetime.datetime.now()
+        with self._lock:
+            self._pending.append((created.timestamp(), created.date().isoformat(), body))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def add_many(self, notes):
+        """Writes (created, body) pairs in a single transaction"""
+        rows = [(created.timestamp(), created.date().isoformat(), body.strip())
+                for created, body in notes if body.strip()]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO notes(created, day, body) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            rows, self._pending = self._pending, []
+            if rows:
+                with self._conn:
+                    self._conn.executemany("INSERT INTO notes(created, day, body) VALUES (?, ?, ?)", rows)
+            return len(rows)
+
+    # --- Reads ---
+    def _rows(self, rows):
+        return [(datetime.datetime.fromtimestamp(created), body) for created, body in rows]
+
+    def search(self, query, limit=5):
+        """
+        Notes containing every content word of query, best match first. If none
+        contain them all, falls back to notes matching at least half of them.
+        """
+        words = list(dict.fromkeys(w for w in WORD_RE.findall(query.lower()) if w not in STOP_WORDS))
+        if not words:
+            return []
+        self.flush()
+        rows = self._match(words, "AND", limit)
+        if not rows and len(words) > 1:
+            needed = (len(words) + 1) // 2
+            rows = [row for row in self._match(words, "OR", limit * 4)
+                    if sum(1 for w in words if w in set(WORD_RE.findall(row[1].lower()))) >= needed][:limit]
+        return self._rows(rows)
+
+    def _match(self, words, conjunction, limit):
+        with self._lock:
+            if self.has_fts:
+                # Quote each word so user speech can never be parsed as FTS syntax
+                match = f" {conjunction} ".join('"' + w.replace('"', '""') + '"' for w in words)
+                return self._conn.execute(
+                    "SELECT n.created, n.body FROM notes_fts f JOIN notes n ON n.id = f.rowid "
+                    "WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts), n.created DESC LIMIT ?",
+                    (match, limit)).fetchall()
+            clause = f" {conjunction} ".join("body LIKE ?" for _ in words)
+            return self._conn.execute(
+                f"SELECT created, body FROM notes WHERE {clause} ORDER BY created DESC LIMIT ?",
+                [f"%{w}%" for w in words] + [limit]).fetchall()
+
+    def notes_on(self, day, limit=20):
+        """Notes taken on a date, oldest first"""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT created, body FROM notes WHERE day = ? ORDER BY created LIMIT ?",
+                (day.isoformat(), limit)).fetchall()
+        return self._rows(rows)
+
+    def today(self, limit=20):
+        return self.notes_on(datetime.date.today(), limit)
+
+    def count(self):
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+    # --- Migration ---
+    def migrate_text_file(self, path=None):
+        """
+        Imports the old append-only notes.txt ("<timestamp>: <note>" per line) and
+        renames it so the import runs once. Returns the number of notes imported.
+        """
+        path = path or config.NOTES_LEGACY_PATH
+        if not os.path.exists(path):
+            return 0
+        notes = []
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                found = LEGACY_LINE_RE.match(line.rstrip("\n"))
+                if found:
+                    created = datetime.datetime.fromisoformat(found.group(1))
+                    notes.append((created, found.group(2)))
+                elif line.strip() and notes:
+                    # Continuation of a multi-line note
+                    created, body = notes[-1]
+                    notes[-1] = (created, body + " " + line.strip())
+        imported = self.add_many(notes)
+        os.replace(path, path + ".migrated")
+        print(f"Notes: imported {imported} notes from {path}")
+        return imported
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Returns the shared store, migrating notes.txt on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = NotesStore()
+            _store.migrate_text_file()
+        return _store
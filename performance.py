@@ -0,0 +1,138 @@
+# performance.py
+"""
+Named performance profiles (see config.PERFORMANCE_PROFILES).
+
+Modules read tunables with performance.get(key) at the point of use, and
+long-lived objects (recogniser, widget timers) subscribe with on_change()
+so a profile switch retunes the whole pipeline at runtime.
+"""
+import threading
+
+import config
+import metrics
+
+# Optional dependency for automatic selection
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+AUTO = "auto"
+DEFAULT = "balanced"
+
+_lock = threading.Lock()
+_listeners = []
+_mode = config.PERFORMANCE_PROFILE
+_active = DEFAULT if _mode == AUTO else _mode
+if _active not in config.PERFORMANCE_PROFILES:
+    print(f"Unknown performance profile '{_active}', using {DEFAULT}")
+    _mode, _active = DEFAULT, DEFAULT
+
+
+def get(key):
+    return config.PERFORMANCE_PROFILES[_active][key]
+
+
+def settings():
+    return dict(config.PERFORMANCE_PROFILES[_active])
+
+
+def active():
+    return _active
+
+
+def mode():
+    """The requested mode: a profile name, or "auto" """
+    return _mode
+
+
+def on_change(callback):
+    """callback(name, settings) runs on every switch, and once now with the current profile"""
+    with _lock:
+        _listeners.append(callback)
+    callback(_active, settings())
+
+
+def apply(name):
+    """Switches the active profile. Returns True if it changed."""
+    global _active
+    if name not in config.PERFORMANCE_PROFILES:
+        raise ValueError(f"Unknown performance profile: {name}")
+    with _lock:
+        if name == _active:
+            return False
+        _active = name
+        listeners = list(_listeners)
+    print(f"Performance profile: {name}")
+    metrics.incr("performance.profile_switches", profile=name)
+    metrics.gauge("performance.profile", name)
+    current = settings()
+    for callback in listeners:
+        try:
+            callback(name, current)
+        except Exception as e:
+            print(f"Profile listener error: {e}")
+    return True
+
+
+def set_mode(name):
+    """Selects a fixed profile, or "auto" to follow battery and CPU load"""
+    global _mode
+    if name != AUTO and name not in config.PERFORMANCE_PROFILES:
+        raise ValueError(f"Unknown performance profile: {name}")
+    _mode = name
+    if name == AUTO:
+        return apply(choose_auto())
+    return apply(name)
+
+
+class CpuSampler:
+    """
+    System CPU load since this sampler's previous call. Each sampler keeps its
+    own cpu_times() baseline: psutil.cpu_percent(interval=None) shares one
+    across callers, so two of them shorten each other's sampling interval.
+    """
+    def __init__(self):
+        self._last = psutil.cpu_times() if psutil is not None else None
+
+    def percent(self):
+        if psutil is None:
+            return 0.0
+        now = psutil.cpu_times()
+        last, self._last = self._last, now
+        if last is None:
+            return 0.0
+        total = sum(now) - sum(last)
+        idle = _idle(now) - _idle(last)
+        return 0.0 if total <= 0 else max(0.0, min(100.0, 100.0 * (total - idle) / total))
+
+
+def _idle(times):
+    # As psutil.cpu_percent: time waiting on I/O is not load
+    return times.idle + getattr(times, "iowait", 0.0)
+
+
+_auto_cpu = CpuSampler()
+
+
+def choose_auto():
+    """low-power on a low battery or a busy CPU, max-responsiveness on mains power when idle"""
+    if psutil is None:
+        return DEFAULT
+    cpu = _auto_cpu.percent()
+    battery = psutil.sensors_battery() if hasattr(psutil, "sensors_battery") else None
+    on_battery = battery is not None and not battery.power_plugged
+    if on_battery and battery.percent < config.PERFORMANCE_LOW_BATTERY_PERCENT:
+        return "low-power"
+    if cpu > config.PERFORMANCE_HIGH_CPU_PERCENT:
+        return "low-power"
+    if on_battery:
+        return DEFAULT
+    return "max-responsiveness" if cpu < config.PERFORMANCE_HIGH_CPU_PERCENT / 2 else DEFAULT
+
+
+def auto_tick():
+    """Re-evaluates the profile when in auto mode. Call periodically."""
+    if _mode == AUTO:
+        return apply(choose_auto())
+    return False
@@ -0,0 +1,208 @@
+# prefetcher.py
+"""
+Usage-driven TTS prefetch.
+
+Learns which intent tends to follow which (overall and by hour of day) and
+which slot values each intent is used with. During idle time it
+pre-synthesises responses of the most likely next intents that are not
+cached yet: time-dependent phrases such as the time for the upcoming minute,
+and templated responses filled with learned slot values ("Could not open
+Safari" for an app that has so far always opened).
+
+The voice cache is never evicted, so a literal response is cached from the
+first time it is spoken; learned literals are only re-synthesised when
+their cache file has been deleted.
+"""
+import os
+import json
+import datetime
+import threading
+
+import config
+import metrics
+
+
+# --- 1. Phrase builders shared with the intent handlers ---
+def time_response(now):
+    return f"The time is {now.strftime('%I:%M %p')}"
+
+
+def date_response(now):
+    return f"Today is {now.strftime('%A, %B %d')}"
+
+
+def volume_level(number):
+    """The level cmd_volume actually sets for a spoken number"""
+    return max(0, min(100, int(number)))
+
+
+def volume_response(level):
+    return f"Volume set to {level} percent."
+
+
+# Responses that change with the clock: predict them for the near future instead of learning literals
+DYNAMIC_RESPONSES = {
+    "time": lambda now: [time_response(now + datetime.timedelta(minutes=1)), time_response(now)],
+    "date": lambda now: [date_response(now)],
+}
+
+# Responses built from a slot: intent -> (slot, value as the handler uses it,
+# response builders). Each learned value predicts every builder, including
+# the ones it has not been spoken with yet.
+TEMPLATED_RESPONSES = {
+    "open_app": ("app", str, ["Opening {}".format, "Could not open {}".format]),
+    "search": ("query", str, ["Searching Google for {}".format]),
+    "volume": ("number", volume_level, [volume_response]),
+}
+
+START = "<start>"
+
+
+def _count(counts, key, limit):
+    """Increments counts[key], dropping the rarest key beyond limit"""
+    counts[key] = counts.get(key, 0) + 1
+    if len(counts) > limit:
+        del counts[min(counts, key=counts.get)]
+
+
+class Prefetcher:
+    def __init__(self, path=None, max_responses=20, min_seen=2, speech=None):
+        if speech is None:
+            # Imported here so predictions can be exercised without the TTS stack
+            import speech_engine as speech
+        self.speech = speech
+        self.path = path or config.PREFETCH_HISTORY_PATH
+        self.max_responses = max_responses
+        self.min_seen = min_seen
+        self._lock = threading.Lock()
+        self.transitions = {}
+        self.hourly = {}
+        self.responses = {}
+        self.slot_values = {}
+        self.last_intent = START
+        self.last_intent_time = 0.0
+        self._dirty = 0
+        self.load()
+        speech.speak_hooks.append(self.observe_response)
+
+    # --- Persistence ---
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.transitions = data.get("transitions", {})
+            self.hourly = data.get("hourly", {})
+            self.responses = data.get("responses", {})
+            self.slot_values = data.get("slot_values", {})
+        except (ValueError, OSError) as e:
+            print(f"Prefetch history unreadable, starting fresh: {e}")
+
+    def save(self):
+        with self._lock:
+            data = {"transitions": self.transitions, "hourly": self.hourly,
+                    "responses": self.responses, "slot_values": self.slot_values}
+            self._dirty = 0
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    # --- Learning ---
+    def observe_intent(self, name, slots=None, now=None):
+        """Called on every dispatched intent, with the slots it matched"""
+        now = now or datetime.datetime.now()
+        with self._lock:
+            if name in TEMPLATED_RESPONSES and slots:
+                slot, normalise, _ = TEMPLATED_RESPONSES[name]
+                if slots.get(slot) is not None:
+                    value = str(normalise(slots[slot]))
+                    _count(self.slot_values.setdefault(name, {}), value, self.max_responses)
+            bucket = self.transitions.setdefault(self.last_intent, {})
+            bucket[name] = bucket.get(name, 0) + 1
+            hour = self.hourly.setdefault(str(now.hour), {})
+            hour[name] = hour.get(name, 0) + 1
+            self.last_intent = name
+            self.last_intent_time = now.timestamp()
+            self._dirty += 1
+            dirty = self._dirty
+        if dirty >= 20:
+            self.save()
+
+    def observe_response(self, text):
+        """speak() hook: attributes a spoken phrase to the intent that just ran"""
+        now = datetime.datetime.now().timestamp()
+        with self._lock:
+            intent = self.last_intent
+            if (intent == START or now - self.last_intent_time > 30
+                    or intent in DYNAMIC_RESPONSES or intent in TEMPLATED_RESPONSES):
+                return
+            _count(self.responses.setdefault(intent, {}), text, self.max_responses)
+
+    # --- Prediction ---
+    def predict(self, previous=None, now=None, limit=3):
+        """Likely next intents, scored by P(next | previous) + P(next | hour)"""
+        now = now or datetime.datetime.now()
+        previous = previous or self.last_intent
+        scores = {}
+        with self._lock:
+            for table in (self.transitions.get(previous, {}), self.hourly.get(str(now.hour), {})):
+                total = sum(table.values())
+                for intent, count in table.items():
+                    scores[intent] = scores.get(intent, 0.0) + count / total
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return ranked[:limit]
+
+    def likely_responses(self, intent, now, limit=2):
+        if intent in DYNAMIC_RESPONSES:
+            return DYNAMIC_RESPONSES[intent](now)[:limit]
+        if intent in TEMPLATED_RESPONSES:
+            _, normalise, builders = TEMPLATED_RESPONSES[intent]
+            with self._lock:
+                seen = self.slot_values.get(intent, {})
+                common = [value for value, count in seen.items() if count >= self.min_seen]
+                ranked = sorted(common, key=seen.get, reverse=True)
+            # Older histories may hold values the handler never uses as-is (volume 150)
+            values = list(dict.fromkeys(normalise(value) for value in ranked))[:limit]
+            return [build(value) for value in values for build in builders]
+        with self._lock:
+            seen = self.responses.get(intent, {})
+            common = [text for text, count in seen.items() if count >= self.min_seen]
+            return sorted(common, key=seen.get, reverse=True)[:limit]
+
+    def on_idle(self, now=None, budget=None):
+        """
+        Pre-synthesises the responses of the likely next intents, most likely
+        first, queueing at most `budget` phrases. Returns the phrases queued.
+        """
+        now = now or datetime.datetime.now()
+        budget = config.PREFETCH_IDLE_BUDGET if budget is None else budget
+        queued = []
+        for intent in self.predict(now=now):
+            for text in self.likely_responses(intent, now):
+                if len(queued) >= budget:
+                    break
+                # False when it is already cached or being synthesised; that costs nothing
+                if self.speech.prefetch(text, source="predictive"):
+                    queued.append(text)
+        if queued:
+            metrics.incr("tts.predictive_prefetches", len(queued))
+        return queued
+
+    def publish_stats(self):
+        """Hit rate of the cache overall, and the share of hits only the prefetcher made possible"""
+        hits = metrics.get("tts.cache_hits")
+        lookups = hits + metrics.get("tts.cache_misses")
+        metrics.gauge("tts.cache_hit_rate", hits / lookups if lookups else 0.0)
+        metrics.gauge("tts.predictive_hit_share", metrics.ratio("tts.predictive_hits", "tts.cache_hits"))
+
+
+_prefetcher = None
+
+
+def get_prefetcher():
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = Prefetcher()
+    return _prefetcher
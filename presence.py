@@ -0,0 +1,198 @@
+# presence.py
+"""
+Fast re-authentication.
+
+A successful face scan opens a verified-presence window
+(config.PRESENCE_WINDOW_SECONDS). While it is open, a background monitor
+grabs one camera frame every config.PRESENCE_CHECK_INTERVAL_MS and runs it
+through the already-loaded LBPH model; each sighting of the user extends
+the window. The window is persisted, so a relaunch inside it skips the
+cold scan (model load, camera open, up to 8 s of scanning). It closes once
+the user has not been seen for a full window, or as soon as
+config.PRESENCE_MAX_MISSES checks in a row see only faces that are not the
+user; the next launch then scans again.
+"""
+import os
+import json
+import time
+import threading
+
+import cv2
+
+import config
+import metrics
+import tracing
+import face_auth
+
+
+class PresenceState:
+    def __init__(self, path=None, window=None, save_every=30.0):
+        self.path = path or config.PRESENCE_STATE_PATH
+        self.window = config.PRESENCE_WINDOW_SECONDS if window is None else window
+        self.save_every = save_every
+        self.verified_at = 0.0
+        self.last_seen = 0.0
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        self.load()
+        metrics.gauge("presence.window_seconds", self.window)
+
+    # --- Persistence ---
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.verified_at = data.get("verified_at", 0.0)
+            self.last_seen = data.get("last_seen", 0.0)
+        except (ValueError, OSError) as e:
+            print(f"Presence state unreadable, a full scan will run: {e}")
+
+    def save(self):
+        with self._lock:
+            data = {"verified_at": self.verified_at, "last_seen": self.last_seen}
+            self._saved_at = time.time()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    # --- Window ---
+    def remaining(self, now=None):
+        """Seconds left in the verified-presence window (0 when closed)"""
+        now = now or time.time()
+        return max(0.0, self.last_seen + self.window - now)
+
+    def valid(self, now=None):
+        return self.window > 0 and face_auth.is_user_registered() and self.remaining(now) > 0
+
+    def verified(self, now=None):
+        """A full scan succeeded: opens a new window"""
+        now = now or time.time()
+        with self._lock:
+            self.verified_at = now
+            self.last_seen = now
+        self.save()
+
+    def seen(self, now=None):
+        """The user was recognised by a presence check: extends the window"""
+        now = now or time.time()
+        with self._lock:
+            self.last_seen = now
+            due = now - self._saved_at >= self.save_every
+        metrics.gauge("presence.remaining_seconds", self.remaining(now))
+        if due:
+            self.save()
+
+    def clear(self):
+        with self._lock:
+            self.verified_at = 0.0
+            self.last_seen = 0.0
+        self.save()
+
+
+class PresenceMonitor:
+    """
+    Low-FPS background presence checks with the warm LBPH model. start() runs
+    them on a thread; a worker process calls run() directly with its own stop
+    event.
+    """
+    def __init__(self, state, interval_ms=None, stop=None):
+        self.state = state
+        self.interval = (interval_ms or config.PRESENCE_CHECK_INTERVAL_MS) / 1000
+        self._stop = stop or threading.Event()
+        self._thread = None
+        metrics.gauge("presence.check_interval_ms", int(self.interval * 1000))
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="blaze-presence", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def check(self, recognizer, cap):
+        """
+        One presence check. Returns True if the user is in front of the camera,
+        False if only other faces are, None if no face (or no frame) was seen.
+        """
+        with tracing.span("presence.check") as span:
+            # Drop the frame buffered since the last check; it is up to `interval` old
+            cap.grab()
+            ret, frame = cap.read()
+            if not ret:
+                span.set(frame=False)
+                return None
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = face_auth.detect_faces(gray)
+            present = face_auth.matches_user(recognizer, gray, faces) if len(faces) else None
+            span.set(present=present)
+        metrics.incr("presence.checks")
+        if present:
+            metrics.incr("presence.seen")
+        elif present is False:
+            metrics.incr("presence.unrecognised")
+        return present
+
+    def _open_camera(self):
+        cap = cv2.VideoCapture(0)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, config.PRESENCE_CAPTURE_WIDTH)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, config.PRESENCE_CAPTURE_HEIGHT)
+        return cap
+
+    def run(self):
+        """Checks until stop() or until the window closes"""
+        try:
+            recognizer = face_auth.load_model()
+        except Exception as e:
+            print(f"Presence checks disabled: {e}")
+            return
+        cap = None
+        # Only a sighting of the user resets this; frames without a face do not
+        misses = 0
+        try:
+            while not self._stop.wait(self.interval):
+                if cap is None:
+                    cap = self._open_camera()
+                present = self.check(recognizer, cap)
+                if not config.PRESENCE_KEEP_CAMERA_OPEN:
+                    cap.release()
+                    cap = None
+                if present:
+                    misses = 0
+                    self.state.seen()
+                    continue
+                if present is False:
+                    misses += 1
+                    if misses >= config.PRESENCE_MAX_MISSES:
+                        # Someone else is at the machine: the next launch does a full scan
+                        metrics.incr("presence.revoked")
+                        print("Unrecognised face, presence window closed")
+                        self.state.clear()
+                        break
+                if not self.state.valid():
+                    # Not seen for a whole window: the next launch does a full scan
+                    metrics.incr("presence.expired")
+                    print("Presence window expired")
+                    break
+        finally:
+            if cap is not None:
+                cap.release()
+            self.state.save()
+
+
+_state = None
+
+
+def get_state():
+    global _state
+    if _state is None:
+        _state = PresenceState()
+    return _state
@@ -0,0 +1,168 @@
+# screenshot_service.py
+"""
+Screenshot capture with off-thread encoding.
+
+capture() only grabs the frame and hands it to a bounded write queue; a
+single writer thread does the PNG/JPEG/WebP encoding and the disk write.
+When the queue is full the new frame is dropped (and counted) instead of
+blocking the caller.
+"""
+import os
+import queue
+import datetime
+import threading
+
+import config
+
+# Optional dependency for fast frame grabs (pyautogui shells out on macOS)
+try:
+    import mss
+except ImportError:
+    mss = None
+
+FORMATS = {"png": "PNG", "jpg": "JPEG", "jpeg": "JPEG", "webp": "WEBP"}
+
+
+class ScreenshotService:
+    def __init__(self, directory=None, fmt=None, compress_level=None, quality=None, max_pending=None):
+        self.directory = directory or config.SCREENSHOT_DIR
+        self.fmt = (fmt or config.SCREENSHOT_FORMAT).lower()
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {self.fmt}")
+        self.compress_level = config.SCREENSHOT_COMPRESS_LEVEL if compress_level is None else compress_level
+        self.quality = config.SCREENSHOT_QUALITY if quality is None else quality
+        self.queue = queue.Queue(maxsize=max_pending or config.SCREENSHOT_MAX_PENDING)
+        self.saved = 0
+        self.dropped = 0
+        self._name_lock = threading.Lock()
+        self._last_stamp = None
+        self._same_stamp = 0
+        self._burst_stop = threading.Event()
+        self._burst_thread = None
+        self._writer = threading.Thread(target=self._write_loop, name="blaze-screenshot-writer", daemon=True)
+        self._writer.start()
+
+    # --- Capture ---
+    def grab(self, region=None):
+        """Returns a PIL image of the screen or of region=(left, top, width, height)"""
+        if mss is not None:
+            from PIL import Image
+            with mss.mss() as sct:
+                if region:
+                    left, top, width, height = region
+                    monitor = {"left": left, "top": top, "width": width, "height": height}
+                else:
+                    monitor = sct.monitors[0]
+                shot = sct.grab(monitor)
+                return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+        import pyautogui
+        return pyautogui.screenshot(region=region)
+
+    def next_path(self):
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        with self._name_lock:
+            # Bursts can land in the same millisecond; keep every name unique
+            self._same_stamp = self._same_stamp + 1 if stamp == self._last_stamp else 0
+            self._last_stamp = stamp
+            suffix = f"_{self._same_stamp}" if self._same_stamp else ""
+        return os.path.join(self.directory, f"screenshot_{stamp}{suffix}.{self.fmt}")
+
+    def capture(self, region=None, on_saved=None):
+        """
+        Grabs one frame and queues it for encoding. Returns the target path, or
+        None if dropped. on_saved(path, ok) runs on the writer thread once written.
+        """
+        image = self.grab(region)
+        path = self.next_path()
+        try:
+            self.queue.put_nowait((image, path, on_saved))
+        except queue.Full:
+            self.dropped += 1
+            print("Screenshot dropped: write queue full")
+            return None
+        return path
+
+    def burst(self, count, interval=0.5, region=None, on_done=None):
+        """Captures count frames interval seconds apart on a background thread"""
+        self.stop_burst()
+        self._burst_stop.clear()
+
+        def run():
+            paths = []
+            for i in range(count):
+                if i and self._burst_stop.wait(interval):
+                    break
+                path = self.capture(region)
+                if path:
+                    paths.append(path)
+            if on_done:
+                on_done(paths)
+
+        self._burst_thread = threading.Thread(target=run, name="blaze-screenshot-burst", daemon=True)
+        self._burst_thread.start()
+        return self._burst_thread
+
+    def start_interval(self, interval, region=None):
+        """Captures every interval seconds until stop_burst()"""
+        self.stop_burst()
+        self._burst_stop.clear()
+
+        def run():
+            while True:
+                self.capture(region)
+                if self._burst_stop.wait(interval):
+                    break
+
+        self._burst_thread = threading.Thread(target=run, name="blaze-screenshot-interval", daemon=True)
+        self._burst_thread.start()
+        return self._burst_thread
+
+    def stop_burst(self):
+        self._burst_stop.set()
+        if self._burst_thread and self._burst_thread is not threading.current_thread():
+            self._burst_thread.join(timeout=1)
+        self._burst_thread = None
+
+    # --- Encoding ---
+    def save_options(self):
+        if self.fmt == "png":
+            return {"compress_level": self.compress_level}
+        return {"quality": self.quality}
+
+    def _write_loop(self):
+        while True:
+            image, path, on_saved = self.queue.get()
+            ok = False
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                if FORMATS[self.fmt] == "JPEG" and image.mode != "RGB":
+                    image = image.convert("RGB")
+                image.save(path, FORMATS[self.fmt], **self.save_options())
+                self.saved += 1
+                ok = True
+            except Exception as e:
+                print(f"Screenshot Save Error: {e}")
+            finally:
+                if on_saved:
+                    # A failing callback must not take the only writer down with it
+                    try:
+                        on_saved(path, ok)
+                    except Exception as e:
+                        print(f"Screenshot callback error: {e}")
+                self.queue.task_done()
+
+    def wait_idle(self):
+        """Blocks until every queued frame is written"""
+        self.queue.join()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ScreenshotService()
+        return _service
@@ -0,0 +1,80 @@
+# shm_ring.py
+"""
+Single-producer ring buffer in multiprocessing.shared_memory, used by the
+multi-process mode (workers.py) to move camera frames and audio between
+processes without pickling them.
+"""
+import sys
+import struct
+from multiprocessing import shared_memory
+
+
+class ShmRing:
+    """
+    Fixed-size slots in one shared memory block, written round-robin by a
+    single producer. Each slot has a sequence number in the header; it is -1
+    while the slot is being written, so readers can tell when a slot was
+    reused under them and drop the stale data.
+    """
+    _SEQ = struct.Struct("q")
+
+    def __init__(self, slots, slot_bytes, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self._header = slots * self._SEQ.size
+        create = name is None
+        options = {"track": False} if not create and sys.version_info >= (3, 13) else {}
+        self.shm = shared_memory.SharedMemory(name=name, create=create,
+                                              size=self._header + slots * slot_bytes, **options)
+        self._written = 0
+        if create:
+            self.shm.buf[:self._header] = bytes(self._header)
+
+    @classmethod
+    def attach(cls, spec):
+        name, slots, slot_bytes = spec
+        return cls(slots, slot_bytes, name=name)
+
+    def spec(self):
+        """Picklable description passed to the worker processes"""
+        return (self.shm.name, self.slots, self.slot_bytes)
+
+    def _seq(self, slot):
+        return self._SEQ.unpack_from(self.shm.buf, slot * self._SEQ.size)[0]
+
+    def _set_seq(self, slot, seq):
+        self._SEQ.pack_into(self.shm.buf, slot * self._SEQ.size, seq)
+
+    def view(self, slot, nbytes):
+        """Zero-copy memoryview of a slot's first nbytes"""
+        start = self._header + slot * self.slot_bytes
+        return self.shm.buf[start:start + nbytes]
+
+    def write(self, data):
+        """Copies data into the next slot. Returns (slot, seq), or None if it does not fit."""
+        data = memoryview(data).cast("B")
+        if data.nbytes > self.slot_bytes:
+            return None
+        self._written += 1
+        seq = self._written
+        slot = seq % self.slots
+        self._set_seq(slot, -1)
+        self.view(slot, data.nbytes)[:] = data
+        self._set_seq(slot, seq)
+        return slot, seq
+
+    def valid(self, slot, seq):
+        """True if the slot still holds write number `seq`"""
+        return self._seq(slot) == seq
+
+    def read(self, slot, seq, nbytes):
+        """A copy of the slot, or None if it was overwritten before or during the read"""
+        if not self.valid(slot, seq):
+            return None
+        data = bytes(self.view(slot, nbytes))
+        return data if self.valid(slot, seq) else None
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
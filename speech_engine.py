@@ -5,6 +5,14 @@ import speech_recognition as sr
 import config
 import threading
 import hashlib
+import re
+import time
+import subprocess
+from collections import deque
+import tracing
+import metrics
+import performance
+import voice_bank
 
 # --- CONFIGURATION: MALE VOICE ---
 VOICE = "en-US-ChristopherNeural" 
@@ -13,19 +21,56 @@ VOICE = "en-US-ChristopherNeural"
 CACHE_DIR = "voice_cache"
 if not os.path.exists(CACHE_DIR):
     os.makedirs(CACHE_DIR)
+# Memory-mapped PCM of the cached phrases (see voice_bank.py)
+bank = voice_bank.get_bank()
 
 # --- 1. Global Microphone Initialization ---
 recognizer = sr.Recognizer()
 mic = sr.Microphone()
 recognizer.dynamic_energy_threshold = False
-recognizer.energy_threshold = 400
+# Ambient level measured by calibrate(); 0 until the microphone is first used
+_ambient_energy = 0
 
-try:
-    with mic as source:
-        print("Calibrating background noise... (One time)")
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)
-except Exception as e:
-    print(f"Microphone error: {e}")
+def _apply_energy_threshold(settings):
+    """The profile's energy_threshold is a floor over the calibrated ambient level"""
+    recognizer.energy_threshold = max(_ambient_energy, settings["energy_threshold"])
+
+performance.on_change(lambda name, settings: _apply_energy_threshold(settings))
+# The microphone stream can only be opened by one listener at a time
+mic_lock = threading.Lock()
+
+# --- Self-speech tracking (echo suppression) ---
+# Every playback is recorded as [text, start, end]; end stays None while playing.
+_playback_lock = threading.Lock()
+_recent_speech = deque(maxlen=8)
+_active_playbacks = 0
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# --- Prefetch bookkeeping ---
+# text -> who prefetched it ("static" hard-coded phrases or the "predictive" prefetcher)
+_prefetched = {}
+_prefetch_inflight = set()
+_prefetch_lock = threading.Lock()
+# Called with the text of every speak(); used by the prefetcher to learn responses
+speak_hooks = []
+
+_calibrated = False
+
+def calibrate():
+    """Measures background noise once, on first use of the microphone"""
+    global _calibrated, _ambient_energy
+    with mic_lock:
+        if _calibrated:
+            return
+        _calibrated = True
+        try:
+            with mic as source:
+                print("Calibrating background noise... (One time)")
+                recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            _ambient_energy = recognizer.energy_threshold
+            _apply_energy_threshold(performance.settings())
+        except Exception as e:
+            print(f"Microphone error: {e}")
 
 # --- 2. Caching & Audio Logic ---
 def get_cache_path(text):
@@ -42,44 +87,183 @@ async def _generate_audio(text, output_file):
         print(f"TTS Gen Error: {e}")
         return False
 
-def _run_speak_thread(text):
+def _in_bank(file_path):
+    return config.VOICE_BANK_ENABLED and voice_bank.key_for(file_path) in bank
+
+def _start_banked(file_path):
+    """A started voice-bank player, or None to fall back to afplay (including on device errors)"""
+    if not _in_bank(file_path):
+        return None
+    try:
+        return bank.start(voice_bank.key_for(file_path))
+    except Exception as e:
+        # sounddevice.PortAudioError is not an OSError
+        print(f"Voice bank playback error, using afplay: {e}")
+        metrics.incr("voice_bank.playback_errors")
+        return None
+
+def _play(file_path, trace, text=""):
+    global _active_playbacks
+    entry = [text, time.time(), None]
+    with _playback_lock:
+        _recent_speech.append(entry)
+        _active_playbacks += 1
+    try:
+        with tracing.span("tts.playback", trace=trace) as span:
+            # Until the player is up: the audio stream open, or the afplay process spawned
+            with tracing.span("tts.player_start", trace=trace):
+                player = _start_banked(file_path)
+                banked = player is not None
+                if not banked:
+                    player = subprocess.Popen(["afplay", file_path])
+            tracing.mark("tts.first_audio", trace=trace)
+            try:
+                player.wait()
+            except Exception as e:
+                if not banked:
+                    raise
+                # The device failed mid-clip: replay it through afplay rather than go silent
+                print(f"Voice bank playback error, using afplay: {e}")
+                metrics.incr("voice_bank.playback_errors")
+                banked = False
+                subprocess.Popen(["afplay", file_path]).wait()
+            span.set(banked=banked)
+    except OSError as e:
+        print(f"Playback Error: {e}")
+    finally:
+        with _playback_lock:
+            entry[2] = time.time()
+            _active_playbacks -= 1
+
+def is_speaking(tail=None):
+    """True while Blaze's own audio is playing, or within `tail` seconds of it ending"""
+    tail = config.ECHO_TAIL_SECONDS if tail is None else tail
+    with _playback_lock:
+        if _active_playbacks:
+            return True
+        ends = [end for _, _, end in _recent_speech if end is not None]
+    return bool(ends) and time.time() - max(ends) < tail
+
+def _wait_for_silence(max_wait=10.0):
+    """Keeps the microphone closed while Blaze is talking. Returns seconds waited."""
+    start = time.time()
+    while is_speaking() and time.time() - start < max_wait:
+        time.sleep(0.05)
+    return time.time() - start
+
+def is_echo(heard, capture_start, capture_end):
+    """
+    True if `heard` is mostly words Blaze was saying during the capture window,
+    i.e. the microphone picked up our own TTS rather than the user.
+    """
+    heard_words = _WORD_RE.findall(heard.lower())
+    if not heard_words:
+        return False
+    tail = config.ECHO_TAIL_SECONDS
+    with _playback_lock:
+        overlapping = [text for text, start, end in _recent_speech
+                       if start <= capture_end and (end is None or end + tail >= capture_start)]
+    for text in overlapping:
+        spoken = set(_WORD_RE.findall(text.lower()))
+        overlap = sum(1 for word in heard_words if word in spoken) / len(heard_words)
+        if overlap >= config.ECHO_SIMILARITY:
+            return True
+    return False
+
+def _run_speak_thread(text, trace=None):
     file_path = get_cache_path(text)
     
+    # Only the first lookup after a prefetch is credited to it; later hits would have happened anyway
+    with _prefetch_lock:
+        source = _prefetched.pop(text, None)
+
     # 1. Check if we already have this audio cached
-    if os.path.exists(file_path):
-        os.system(f"afplay '{file_path}'")
+    if _in_bank(file_path) or os.path.exists(file_path):
+        tracing.mark("tts.cache_hit", trace=trace)
+        metrics.incr("tts.cache_hits")
+        if source == "predictive":
+            metrics.incr("tts.predictive_hits")
+        _play(file_path, trace, text)
         return
+    metrics.incr("tts.cache_misses")
 
     # 2. If not, generate it
     try:
-        success = asyncio.run(_generate_audio(text, file_path))
+        with tracing.span("tts.synthesize", trace=trace, chars=len(text)):
+            success = asyncio.run(_generate_audio(text, file_path))
         
         # 3. Play it
         if success and os.path.exists(file_path):
-            os.system(f"afplay '{file_path}'")
+            _play(file_path, trace, text)
+            bank.add_file(file_path)
             # We DO NOT delete the file anymore. We keep it for speed next time.
     except Exception as e:
         print(f"Playback Error: {e}")
 
-def prefetch(text):
-    """Generates audio in background WITHOUT playing it (for speed)"""
+def prefetch(text, source="static"):
+    """Generates audio in background WITHOUT playing it (for speed). Returns True if queued."""
     file_path = get_cache_path(text)
-    if not os.path.exists(file_path):
-        threading.Thread(target=lambda: asyncio.run(_generate_audio(text, file_path)), daemon=True).start()
+    if _in_bank(file_path) or os.path.exists(file_path):
+        return False
+    with _prefetch_lock:
+        if text in _prefetch_inflight:
+            return False
+        _prefetch_inflight.add(text)
+        _prefetched[text] = source
+
+    def run():
+        try:
+            if asyncio.run(_generate_audio(text, file_path)):
+                bank.add_file(file_path)
+        finally:
+            with _prefetch_lock:
+                _prefetch_inflight.discard(text)
+
+    threading.Thread(target=run, daemon=True).start()
+    return True
 
 def speak(text):
     """Plays audio (Instant if cached, otherwise generates)"""
     print(f"{config.ASSISTANT_NAME}: {text}")
-    threading.Thread(target=_run_speak_thread, args=(text,), daemon=True).start()
+    for hook in speak_hooks:
+        try:
+            hook(text)
+        except Exception as e:
+            print(f"Speak hook error: {e}")
+    threading.Thread(target=_run_speak_thread, args=(text, tracing.current()), daemon=True).start()
+
+def accept_recognition(command, trace, capture_start, capture_end):
+    """Filters out our own echo and makes the utterance the current trace. Returns the command or "none"."""
+    metrics.incr("voice.recognitions")
+    # Blaze started talking mid-capture and heard itself
+    if is_echo(command, capture_start, capture_end):
+        metrics.incr("voice.echo_suppressed")
+        metrics.incr("voice.wasted_recognitions", reason="echo")
+        print(f"(ignored echo: {command})")
+        return "none"
+    # Everything that follows from this utterance belongs to its trace
+    tracing.set_current(trace)
+    print(f"You: {command}")
+    return command.lower()
 
 def listen():
-    with mic as source:
+    calibrate()
+    # Gate: don't record (and pay for recognition of) our own voice
+    waited = _wait_for_silence()
+    if waited > 0.05:
+        metrics.incr("voice.gated_waits")
+    with mic_lock, mic as source:
         print("Listening...")
+        trace = tracing.new_trace()
         try:
-            audio = recognizer.listen(source, timeout=5, phrase_time_limit=5)
-            command = recognizer.recognize_google(audio)
-            print(f"You: {command}")
-            return command.lower()
+            capture_start = time.time()
+            with tracing.span("speech.capture", trace=trace):
+                audio = recognizer.listen(source, timeout=performance.get("listen_timeout"),
+                                          phrase_time_limit=performance.get("phrase_time_limit"))
+            capture_end = time.time()
+            with tracing.span("speech.recognize", trace=trace):
+                command = recognizer.recognize_google(audio)
+            return accept_recognition(command, trace, capture_start, capture_end)
         except sr.WaitTimeoutError:
             return "none"
         except sr.UnknownValueError:
@@ -0,0 +1,10 @@
+# tests/conftest.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+
+# Metric counters also emit trace marks; keep test runs from writing trace files
+config.TRACE_ENABLED = False
@@ -0,0 +1,75 @@
+# tests/test_automation_backend.py
+import time
+
+import pytest
+
+import automation_backend
+from automation_backend import AutomationError, FakeBackend, HelperProcessBackend
+
+
+class ShellBackend(HelperProcessBackend):
+    """A /bin/sh helper whose actions are shell snippets that echo their reply"""
+    name = "test"
+
+    def helper_command(self):
+        return ["/bin/sh"]
+
+    def encode(self, action):
+        return action[1]
+
+    def parse_reply(self, line):
+        return line == "ok"
+
+
+@pytest.fixture
+def shell():
+    backend = ShellBackend(reply_timeout=0.5)
+    yield backend
+    backend.close()
+
+
+def test_fake_backend_batches_with_one_result_per_action():
+    backend = FakeBackend()
+    results = backend.run([("set_volume", 30), ("set_muted", True), ("open_app", "Safari"), ("reboot", None)])
+    assert results == [True, True, True, False]
+    assert backend.batches == 1
+    assert (backend.volume, backend.muted, backend.opened) == (30, True, ["Safari"])
+    assert backend.set_volume(150) and backend.volume == 100
+
+
+def test_helper_batch(shell):
+    assert shell.run([("sh", "echo ok"), ("sh", "echo no"), ("sh", "echo ok")]) == [True, False, True]
+    assert shell.run([]) == []
+
+
+def test_stalled_helper_is_killed(shell):
+    started = time.monotonic()
+    with pytest.raises(AutomationError, match="timed out"):
+        shell.run([("sh", "echo ok"), ("sh", "sleep 5; echo ok")])
+    assert time.monotonic() - started < 2
+    # The next batch gets a fresh helper
+    assert shell.run([("sh", "echo ok")]) == [True]
+
+
+def test_dead_helper_restarts_without_rerunning_answered_actions(shell, tmp_path):
+    log = tmp_path / "log"
+    marker = tmp_path / "died"
+    record = ("sh", f"echo x >> {log}; echo ok")
+    die_once = ("sh", f"if [ -e {marker} ]; then echo ok; else touch {marker}; exit; fi")
+    assert shell.run([record, die_once, record]) == [True, True, True]
+    # The first action replied before the helper died, so it was not sent again
+    assert log.read_text().count("x") == 2
+
+
+def test_helper_that_keeps_dying_gives_up(shell):
+    with pytest.raises(AutomationError, match="not responding"):
+        shell.run([("sh", "exit")])
+
+
+def test_set_backend_swaps_the_process_backend():
+    fake = FakeBackend()
+    automation_backend.set_backend(fake)
+    try:
+        assert automation_backend.get_backend() is fake
+    finally:
+        automation_backend._backend = None
@@ -0,0 +1,56 @@
+# tests/test_command_executor.py
+import time
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from command_executor import CommandExecutor
+
+
+def wait_until(condition, timeout=2.0):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.01)
+    return condition()
+
+
+def grace_period(task):
+    return task.wait(0.3) and task.commit()
+
+
+def test_cancel_during_grace_period():
+    executor = CommandExecutor(max_workers=1)
+    executor.submit("restart", grace_period, cancellable=True)
+    time.sleep(0.05)
+    assert executor.cancel_all() == 1
+    assert wait_until(lambda: not executor.active())
+
+
+def test_committed_and_plain_tasks_cannot_be_cancelled():
+    executor = CommandExecutor(max_workers=2)
+    executor.submit("restart", grace_period, cancellable=True)
+    executor.submit("open_app", lambda task: time.sleep(0.5))
+    time.sleep(0.4)
+    assert executor.cancel_all() == 0
+
+
+def test_stuck_workers_reject_submissions():
+    executor = CommandExecutor(max_workers=1, default_timeout=0.1)
+    errors = []
+    executor.submit("hang", lambda task: time.sleep(0.5))
+    assert wait_until(lambda: executor.stuck() == 1)
+    executor.submit("next", lambda task: None, on_error=errors.append)
+    assert errors
+    assert wait_until(lambda: executor.stuck() == 0)
+
+
+def test_running_tracks_the_submitting_command():
+    executor = CommandExecutor(max_workers=2)
+    with executor.origin("blaze restart"):
+        executor.submit("restart", grace_period, cancellable=True)
+    executor.submit("calibrate", lambda task: time.sleep(0.5))
+    assert executor.running("blaze restart")
+    assert not executor.running("blaze open safari")
+    assert executor.cancel_all() == 1
+    assert wait_until(lambda: not executor.running("blaze restart"))
@@ -0,0 +1,83 @@
+# tests/test_intents.py
+import intents
+
+
+class Handlers:
+    def __getattr__(self, name):
+        return lambda match: name
+
+
+def builtin_router():
+    router = intents.IntentRouter(stop_words={"blaze"})
+    intents.register_builtins(router, Handlers())
+    return router
+
+
+def test_keywords_match_whole_words_only():
+    router = builtin_router()
+    assert router.match("blaze what time is it").name == "time"
+    # "sometimes" contains "time" but is not the word
+    assert router.match("blaze sometimes i wonder") is None
+
+
+def test_pattern_slots():
+    router = builtin_router()
+    found = router.match("blaze open visual studio code")
+    assert found.name == "open_app"
+    assert found.slots["app"] == "visual studio code"
+    assert router.match("blaze search for cheap flights").slots["query"] == "cheap flights"
+
+
+def test_priority_and_required_pattern():
+    router = builtin_router()
+    assert router.match("blaze find my notes about the budget").name == "find_note"
+    # find_note requires its pattern, so plain note-taking still wins
+    assert router.match("blaze take a note").name == "note"
+    assert router.match("blaze cancel that").name == "cancel"
+
+
+def test_screenshot_count_needs_explicit_pattern():
+    router = builtin_router()
+    assert "count" not in router.match("blaze take a screenshot in 5 seconds").slots
+    assert router.match("blaze take 3 screenshots").slots["count"] == "3"
+
+
+def test_unregister():
+    router = builtin_router()
+    router.unregister("time")
+    assert router.match("blaze what time is it") is None
+
+
+def test_power_mode_slot():
+    router = builtin_router()
+    assert router.match("blaze switch to low power mode").slots["mode"] == "low power"
+    assert router.match("blaze automatic mode please").slots["mode"] == "automatic"
+    # Words that merely contain a mode name do not pick it
+    assert "mode" not in router.match("blaze what power mode is the followup using").slots
+
+
+def test_repeat_inside_window_is_dropped():
+    repeats = intents.RepeatFilter(3.0)
+    assert not repeats.is_duplicate("blaze open safari", now=100.0)
+    assert repeats.is_duplicate("blaze open safari", now=102.0)
+    assert not repeats.is_duplicate("blaze open safari", now=106.0)
+
+
+def test_repeat_is_dropped_only_while_its_own_task_runs():
+    running = set()
+    repeats = intents.RepeatFilter(3.0, running.__contains__)
+    assert not repeats.is_duplicate("blaze open safari", now=100.0)
+    # Something else (a note, a restart grace period) is still going
+    running.add("blaze take a note")
+    assert not repeats.is_duplicate("blaze open safari", now=110.0)
+    running.add("blaze open safari")
+    assert repeats.is_duplicate("blaze open safari", now=120.0)
+    # A different command in between resets the comparison
+    assert not repeats.is_duplicate("blaze what time is it", now=121.0)
+    assert not repeats.is_duplicate("blaze open safari", now=122.0)
+
+
+def test_screenshot_interval_and_stop():
+    router = builtin_router()
+    assert router.match("blaze take a screenshot every 10 seconds").slots["every"] == "10"
+    assert router.match("blaze stop taking screenshots").name == "stop_screenshots"
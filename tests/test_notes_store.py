@@ -0,0 +1,49 @@
+# tests/test_notes_store.py
+import datetime
+
+import notes_store
+
+
+def make_store(*bodies, fts=True):
+    store = notes_store.NotesStore(":memory:")
+    store.has_fts = store.has_fts and fts
+    now = datetime.datetime.now()
+    store.add_many([(now, body) for body in bodies])
+    return store
+
+
+NOTES = ["buy the milk", "call the plumber", "fix the car", "budget meeting moved to friday"]
+
+
+def bodies(results):
+    return [body for _, body in results]
+
+
+def test_search_ignores_stop_words():
+    for fts in (True, False):
+        store = make_store(*NOTES, fts=fts)
+        assert bodies(store.search("find my note about the budget meeting")) == ["budget meeting moved to friday"]
+        assert store.search("the") == []
+
+
+def test_search_falls_back_to_partial_matches():
+    for fts in (True, False):
+        store = make_store(*NOTES, fts=fts)
+        assert bodies(store.search("budget plans for friday")) == ["budget meeting moved to friday"]
+        assert store.search("grocery plans tomorrow") == []
+
+
+def test_add_is_batched_until_read():
+    store = notes_store.NotesStore(":memory:", batch_size=10, flush_delay=60)
+    store.add("first note")
+    assert store.count() == 1
+    assert bodies(store.today()) == ["first note"]
+
+
+def test_migrate_text_file(tmp_path):
+    legacy = tmp_path / "notes.txt"
+    legacy.write_text("2024-01-02 10:00:00: old note\n")
+    store = notes_store.NotesStore(":memory:")
+    assert store.migrate_text_file(str(legacy)) == 1
+    assert not legacy.exists()
+    assert bodies(store.search("old note")) == ["old note"]
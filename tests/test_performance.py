@@ -0,0 +1,41 @@
+# tests/test_performance.py
+import collections
+
+import pytest
+
+import performance
+
+
+def test_unknown_mode_is_rejected_before_it_is_stored():
+    mode = performance.mode()
+    with pytest.raises(ValueError):
+        performance.set_mode("turbo")
+    assert performance.mode() == mode
+
+
+class FakePsutil:
+    """cpu_times() grows by the (busy, idle) steps queued in ticks"""
+    def __init__(self):
+        self.user = 0.0
+        self.idle = 0.0
+
+    def tick(self, busy, idle):
+        self.user += busy
+        self.idle += idle
+
+    def cpu_times(self):
+        return collections.namedtuple("scputimes", "user idle")(self.user, self.idle)
+
+
+def test_cpu_samplers_keep_their_own_baselines(monkeypatch):
+    fake = FakePsutil()
+    monkeypatch.setattr(performance, "psutil", fake)
+    auto = performance.CpuSampler()
+    monitor = performance.CpuSampler()
+    fake.tick(busy=9, idle=1)
+    # The monitor samples in between; auto mode still sees its whole interval
+    assert monitor.percent() == pytest.approx(90.0)
+    fake.tick(busy=1, idle=9)
+    assert monitor.percent() == pytest.approx(10.0)
+    assert auto.percent() == pytest.approx(50.0)
+    assert auto.percent() == 0.0
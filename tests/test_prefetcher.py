@@ -0,0 +1,85 @@
+# tests/test_prefetcher.py
+import datetime
+import types
+
+import pytest
+
+import prefetcher
+
+NOON = datetime.datetime(2024, 5, 6, 12, 0)
+
+
+@pytest.fixture
+def speech():
+    """speech_engine stand-in: prefetch() queues anything not already cached"""
+    fake = types.SimpleNamespace(speak_hooks=[], cached=set(), queued=[])
+
+    def prefetch(text, source="static"):
+        if text in fake.cached:
+            return False
+        fake.cached.add(text)
+        fake.queued.append(text)
+        return True
+
+    fake.prefetch = prefetch
+    return fake
+
+
+def make(tmp_path, speech):
+    return prefetcher.Prefetcher(path=str(tmp_path / "history.json"), speech=speech)
+
+
+def test_predict_follows_transitions_and_hour(tmp_path, speech):
+    learned = make(tmp_path, speech)
+    for _ in range(3):
+        learned.observe_intent("time", now=NOON)
+        learned.observe_intent("open_app", {"app": "safari"}, now=NOON)
+    learned.observe_intent("date", now=NOON.replace(hour=8))
+    assert learned.predict(previous="time", now=NOON)[0] == "open_app"
+    assert learned.predict(previous="open_app", now=NOON)[0] == "time"
+    # Only ever used at 8 and never after "time"
+    assert "date" not in learned.predict(previous="time", now=NOON)
+    assert "date" in learned.predict(previous="time", now=NOON.replace(hour=8))
+
+
+def test_history_survives_save_and_load(tmp_path, speech):
+    learned = make(tmp_path, speech)
+    for _ in range(2):
+        learned.observe_intent("search", {"query": "weather"}, now=NOON)
+    learned.save()
+    reloaded = make(tmp_path, speech)
+    assert reloaded.transitions == learned.transitions
+    assert reloaded.likely_responses("search", NOON) == ["Searching Google for weather"]
+
+
+def test_unreadable_history_starts_fresh(tmp_path, speech):
+    (tmp_path / "history.json").write_text("{not json")
+    assert make(tmp_path, speech).transitions == {}
+
+
+def test_templated_responses_need_min_seen_and_clamp_levels(tmp_path, speech):
+    learned = make(tmp_path, speech)
+    learned.observe_intent("open_app", {"app": "safari"}, now=NOON)
+    assert learned.likely_responses("open_app", NOON) == []
+    learned.observe_intent("open_app", {"app": "safari"}, now=NOON)
+    assert learned.likely_responses("open_app", NOON) == ["Opening safari", "Could not open safari"]
+    for level in (150, 120):
+        learned.observe_intent("volume", {"number": level}, now=NOON)
+    # Both are spoken as 100 percent, so only that phrase is worth synthesising
+    assert learned.likely_responses("volume", NOON) == [prefetcher.volume_response(100)]
+
+
+def test_on_idle_spends_its_budget_on_uncached_phrases(tmp_path, speech):
+    learned = make(tmp_path, speech)
+    for app in ("safari", "mail", "notes"):
+        for _ in range(2):
+            learned.observe_intent("open_app", {"app": app}, now=NOON)
+    learned.observe_intent("time", now=NOON)
+    learned.observe_intent("open_app", {"app": "safari"}, now=NOON)
+    speech.cached.add("Opening safari")
+    queued = learned.on_idle(now=NOON, budget=3)
+    assert len(queued) == 3
+    assert "Opening safari" not in queued
+    assert queued == speech.queued
+    # Next tick continues where the budget stopped
+    assert set(learned.on_idle(now=NOON, budget=3)).isdisjoint(queued)
@@ -0,0 +1,58 @@
+# tests/test_presence.py
+import pytest
+
+pytest.importorskip("cv2")
+
+import config
+import presence
+
+
+class Camera:
+    def __init__(self):
+        self.released = 0
+
+    def release(self):
+        self.released += 1
+
+
+def monitor_for(results, tmp_path, monkeypatch):
+    """A monitor whose checks return results in turn, with no real camera or model"""
+    monkeypatch.setattr(presence.face_auth, "load_model", lambda: object())
+    monkeypatch.setattr(presence.face_auth, "is_user_registered", lambda: True)
+    state = presence.PresenceState(path=str(tmp_path / "presence.json"), window=60)
+    state.verified()
+    monitor = presence.PresenceMonitor(state, interval_ms=1)
+    monitor.camera = Camera()
+    monkeypatch.setattr(monitor, "_open_camera", lambda: monitor.camera)
+    script = iter(results)
+
+    def check(recognizer, cap):
+        try:
+            return next(script)
+        except StopIteration:
+            monitor.stop(timeout=0)
+            return True
+
+    monkeypatch.setattr(monitor, "check", check)
+    return monitor
+
+
+def test_unrecognised_faces_close_the_window(tmp_path, monkeypatch):
+    # Frames without a face do not reset the count; a sighting of the user does
+    results = [False, None, False, True] + [False] * config.PRESENCE_MAX_MISSES
+    monitor = monitor_for(results, tmp_path, monkeypatch)
+    monitor.run()
+    assert not monitor.state.valid()
+
+
+def test_empty_frames_keep_the_window(tmp_path, monkeypatch):
+    monitor = monitor_for([None] * 5, tmp_path, monkeypatch)
+    monitor.run()
+    assert monitor.state.valid()
+
+
+def test_camera_released_between_checks(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PRESENCE_KEEP_CAMERA_OPEN", False)
+    monitor = monitor_for([True, True], tmp_path, monkeypatch)
+    monitor.run()
+    assert monitor.camera.released >= 2
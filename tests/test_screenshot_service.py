@@ -0,0 +1,61 @@
+# tests/test_screenshot_service.py
+import os
+import re
+import threading
+
+import screenshot_service
+
+
+class Image:
+    """Stands in for a PIL image; save() can be held until released"""
+    mode = "RGB"
+
+    def __init__(self, hold=None):
+        self.hold = hold
+
+    def save(self, path, fmt, **options):
+        if self.hold:
+            self.hold.wait(5)
+        with open(path, "wb") as f:
+            f.write(fmt.encode())
+
+
+def make_service(tmp_path, monkeypatch, hold=None, max_pending=8):
+    service = screenshot_service.ScreenshotService(directory=str(tmp_path), max_pending=max_pending)
+    monkeypatch.setattr(service, "grab", lambda region=None: Image(hold))
+    return service
+
+
+def test_names_are_timestamped_and_unique(tmp_path, monkeypatch):
+    service = make_service(tmp_path, monkeypatch, max_pending=32)
+    paths = [service.capture() for _ in range(20)]
+    service.wait_idle()
+    assert len(set(paths)) == 20
+    for path in paths:
+        assert re.fullmatch(r"screenshot_\d{8}_\d{6}_\d{3}(_\d+)?\.png", os.path.basename(path))
+        assert os.path.exists(path)
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path, monkeypatch):
+    hold = threading.Event()
+    service = make_service(tmp_path, monkeypatch, hold=hold, max_pending=1)
+    results = [service.capture() for _ in range(4)]
+    # One frame is held by the writer and one waits in the queue; the rest are dropped
+    assert results.count(None) == service.dropped >= 2
+    hold.set()
+    service.wait_idle()
+    assert service.saved == 4 - service.dropped
+
+
+def test_callback_errors_do_not_stop_the_writer(tmp_path, monkeypatch):
+    service = make_service(tmp_path, monkeypatch)
+    saved = []
+
+    def broken(path, ok):
+        raise RuntimeError("callback failed")
+
+    service.capture(on_saved=broken)
+    service.capture(on_saved=lambda path, ok: saved.append(ok))
+    service.wait_idle()
+    assert saved == [True]
+    assert service._writer.is_alive()
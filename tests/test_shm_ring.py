@@ -0,0 +1,51 @@
+# tests/test_shm_ring.py
+import multiprocessing
+
+from shm_ring import ShmRing
+
+
+def _produce(spec, replies, count):
+    ring = ShmRing.attach(spec)
+    for i in range(count):
+        replies.put(ring.write(bytes([i]) * 10))
+    ring.close()
+
+
+def test_write_and_read():
+    ring = ShmRing(4, 16)
+    try:
+        slot, seq = ring.write(b"hello")
+        assert ring.read(slot, seq, 5) == b"hello"
+        assert bytes(ring.view(slot, 5)) == b"hello"
+        assert ring.write(b"x" * 17) is None
+    finally:
+        ring.close(unlink=True)
+
+
+def test_overwritten_slots_are_detected():
+    ring = ShmRing(2, 8)
+    try:
+        first = ring.write(b"a")
+        ring.write(b"b")
+        ring.write(b"c")  # reuses the first slot
+        assert ring.read(*first, 1) is None
+        assert not ring.valid(*first)
+    finally:
+        ring.close(unlink=True)
+
+
+def test_cross_process():
+    ctx = multiprocessing.get_context("spawn")
+    ring = ShmRing(4, 16)
+    replies = ctx.Queue()
+    try:
+        process = ctx.Process(target=_produce, args=(ring.spec(), replies, 6))
+        process.start()
+        written = [replies.get(timeout=30) for _ in range(6)]
+        process.join(30)
+        readable = [ring.read(slot, seq, 10) for slot, seq in written]
+        # Four slots: the first two writes were overwritten by the last two
+        assert readable[:2] == [None, None]
+        assert readable[2:] == [bytes([i]) * 10 for i in range(2, 6)]
+    finally:
+        ring.close(unlink=True)
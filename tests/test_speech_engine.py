@@ -0,0 +1,88 @@
+# tests/test_speech_engine.py
+import pytest
+
+pytest.importorskip("edge_tts")
+pytest.importorskip("speech_recognition")
+pytest.importorskip("pyaudio")
+
+import config
+import speech_engine as io
+
+
+@pytest.fixture
+def said(monkeypatch):
+    """Replaces the playback history with [text, start, end] entries"""
+    history = []
+    monkeypatch.setattr(io, "_recent_speech", history)
+    return history
+
+
+def test_echo_needs_overlapping_playback(said):
+    said.append(["opening safari for you", 10.0, 12.0])
+    assert io.is_echo("opening safari", 11.0, 13.0)
+    # Captured after the playback and its room-echo tail
+    assert not io.is_echo("opening safari", 12.0 + config.ECHO_TAIL_SECONDS + 0.1, 15.0)
+
+
+def test_echo_similarity_threshold(said, monkeypatch):
+    monkeypatch.setattr(config, "ECHO_SIMILARITY", 0.75)
+    said.append(["the time is ten fifteen", 10.0, None])
+    # 3 of 4 heard words were being said
+    assert io.is_echo("the time is now", 11.0, 12.0)
+    # 2 of 4
+    assert not io.is_echo("blaze what time is", 11.0, 12.0)
+
+
+def test_accept_recognition(said):
+    said.append(["going to sleep", 10.0, 11.0])
+    assert io.accept_recognition("going to sleep", "t1", 10.5, 11.5) == "none"
+    assert io.accept_recognition("Blaze Open Safari", "t2", 20.0, 21.0) == "blaze open safari"
+
+
+class Player:
+    def __init__(self, error=None):
+        self.error = error
+
+    def wait(self):
+        if self.error:
+            raise self.error
+
+
+@pytest.fixture
+def afplay(monkeypatch):
+    calls = []
+    monkeypatch.setattr(io.subprocess, "Popen", lambda args: calls.append(args) or Player())
+    return calls
+
+
+def test_disabled_bank_is_not_consulted(monkeypatch):
+    monkeypatch.setattr(io, "bank", {io.voice_bank.key_for("x.mp3"): None})
+    monkeypatch.setattr(config, "VOICE_BANK_ENABLED", True)
+    assert io._in_bank("x.mp3")
+    monkeypatch.setattr(config, "VOICE_BANK_ENABLED", False)
+    assert not io._in_bank("x.mp3")
+
+
+def test_device_errors_fall_back_to_afplay(monkeypatch, afplay):
+    class DeviceError(Exception):
+        pass
+
+    class Bank(dict):
+        def start(self, key):
+            raise DeviceError("no output device")
+
+    monkeypatch.setattr(config, "VOICE_BANK_ENABLED", True)
+    monkeypatch.setattr(io, "bank", Bank({io.voice_bank.key_for("x.mp3"): None}))
+    io._play("x.mp3", None, "hello")
+    assert afplay == [["afplay", "x.mp3"]]
+
+
+def test_failure_mid_clip_replays_through_afplay(monkeypatch, afplay):
+    class Bank(dict):
+        def start(self, key):
+            return Player(error=RuntimeError("stream underflow"))
+
+    monkeypatch.setattr(config, "VOICE_BANK_ENABLED", True)
+    monkeypatch.setattr(io, "bank", Bank({io.voice_bank.key_for("x.mp3"): None}))
+    io._play("x.mp3", None, "hello")
+    assert afplay == [["afplay", "x.mp3"]]
@@ -0,0 +1,19 @@
+# tests/test_tracing.py
+import tracing
+
+
+def test_percentile():
+    assert tracing.percentile([], 50) == 0.0
+    assert tracing.percentile([1, 2, 3, 4], 50) == 2.5
+
+
+def test_summary_measures_speech_to_audio_and_skips_marks():
+    records = [
+        {"span": "speech.capture", "trace": "t", "ts": 10.0, "dur_ms": 1000.0},
+        {"span": "metric.voice.recognitions", "trace": "t", "ts": 11.1, "dur_ms": 0.0},
+        {"span": "tts.first_audio", "trace": "t", "ts": 11.5, "dur_ms": 0.0},
+    ]
+    stages = tracing.summarize(records)
+    assert stages["e2e.speech_to_audio"] == [500.0]
+    assert "metric.voice.recognitions" not in stages
+    assert "tts.first_audio" not in stages
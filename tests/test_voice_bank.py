@@ -0,0 +1,92 @@
+# tests/test_voice_bank.py
+import time
+import types
+import threading
+
+import voice_bank
+
+
+def test_append_and_reload(tmp_path):
+    path = str(tmp_path / "bank.pcm")
+    bank = voice_bank.VoiceBank(path, sample_rate=24000)
+    bank.append({"a": b"\x01\x02" * 4})
+    bank.append({"b": b"\x03\x04"})
+    assert bytes(bank.get("a")) == b"\x01\x02" * 4
+    assert bytes(bank.get("b")) == b"\x03\x04"
+    reopened = voice_bank.VoiceBank(path)
+    assert sorted(reopened.index) == ["a", "b"]
+    assert reopened.sample_rate == 24000
+    assert reopened.get("missing") is None
+
+
+def test_not_a_bank_is_ignored(tmp_path):
+    path = tmp_path / "bank.pcm"
+    path.write_bytes(b"garbage")
+    assert len(voice_bank.VoiceBank(str(path))) == 0
+
+
+def test_compact_keeps_clips_and_adds_loose_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(voice_bank, "decode", lambda mp3_path, rate: open(mp3_path, "rb").read() * 2)
+    path = str(tmp_path / "bank.pcm")
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    (cache / "c.mp3").write_bytes(b"zz")
+    (cache / "a.mp3").write_bytes(b"ignored: already banked")
+    bank = voice_bank.VoiceBank(path)
+    bank.append({"a": b"aa"})
+    bank.append({"b": b"bb"})
+    assert voice_bank.compact(str(cache), path) == (2, 1)
+    bank.load()
+    assert {key: bytes(bank.get(key)) for key in bank.index} == {"a": b"aa", "b": b"bb", "c": b"zzzz"}
+
+
+def test_append_waits_for_compaction(tmp_path, monkeypatch):
+    path = str(tmp_path / "bank.pcm")
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    (cache / "slow.mp3").write_bytes(b"s")
+    bank = voice_bank.VoiceBank(path)
+    bank.append({"a": b"aa"})
+    started = threading.Event()
+    appended = threading.Thread(target=lambda: (started.wait(), bank.append({"b": b"bb"})))
+    appended.start()
+
+    def slow_decode(mp3_path, rate):
+        # An append racing the rebuild would land in the file about to be replaced
+        started.set()
+        time.sleep(0.2)
+        return b"ss"
+
+    monkeypatch.setattr(voice_bank, "decode", slow_decode)
+    voice_bank.compact(str(cache), path)
+    appended.join()
+    bank.load()
+    assert sorted(bank.index) == ["a", "b", "slow"]
+
+
+class Stream:
+    def __init__(self, **options):
+        self.events = []
+
+    def start(self):
+        self.events.append("start")
+
+    def write(self, data):
+        self.events.append(bytes(data))
+
+    def stop(self):
+        self.events.append("stop")
+
+    def close(self):
+        self.events.append("close")
+
+
+def test_start_opens_the_stream_before_wait_plays(tmp_path, monkeypatch):
+    monkeypatch.setattr(voice_bank, "sounddevice", types.SimpleNamespace(RawOutputStream=Stream))
+    bank = voice_bank.VoiceBank(str(tmp_path / "bank.pcm"))
+    bank.append({"a": b"\x01\x02"})
+    assert bank.start("missing") is None
+    player = bank.start("a")
+    assert player.stream.events == ["start"]
+    player.wait()
+    assert player.stream.events == ["start", b"\x01\x02", "stop", "close"]
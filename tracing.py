@@ -0,0 +1,232 @@
+# tracing.py
+"""
+Lightweight latency tracing.
+
+Spans are written as JSON lines to a rotating file through a background
+queue, so recording one costs a dict and a queue put on the hot path.
+Each recognised utterance gets a trace id; spans recorded while it is the
+current trace (recognition, dispatch, automation, TTS) share that id, which
+lets the summary tool measure end-of-speech to first audio.
+
+    python tracing.py summary [trace.jsonl ...]
+"""
+import os
+import sys
+import json
+import time
+import glob
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import functools
+import logging.handlers
+
+import config
+
+_logger = None
+_listener = None
+_setup_lock = threading.Lock()
+_current_trace = None
+# Set in worker processes: records go to the parent over this queue instead of to a file
+_forward_queue = None
+
+
+# --- 1. Sink ---
+def _get_logger():
+    """Creates the queue-backed rotating JSONL writer on first use"""
+    global _logger, _listener
+    if _logger is not None:
+        return _logger
+    with _setup_lock:
+        if _logger is None:
+            os.makedirs(os.path.dirname(config.TRACE_PATH) or ".", exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                config.TRACE_PATH, maxBytes=config.TRACE_MAX_BYTES,
+                backupCount=config.TRACE_BACKUPS, encoding="utf-8")
+            file_handler.setFormatter(logging.Formatter("%(message)s"))
+            span_queue = queue.SimpleQueue()
+            _listener = logging.handlers.QueueListener(span_queue, file_handler)
+            _listener.start()
+            atexit.register(shutdown)
+
+            logger = logging.getLogger("blaze.trace")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(logging.handlers.QueueHandler(span_queue))
+            _logger = logger
+    return _logger
+
+
+def shutdown():
+    """Drains queued spans to disk and stops the writer thread"""
+    global _listener, _logger
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            _logger = None
+
+
+def forward_to(q):
+    """Sends this process's records to `q` as ("trace", record); the owner passes them to emit()"""
+    global _forward_queue
+    _forward_queue = q
+
+
+def emit(record):
+    if not config.TRACE_ENABLED:
+        return
+    if _forward_queue is not None:
+        _forward_queue.put(("trace", record))
+        return
+    _get_logger().info(json.dumps(record, separators=(",", ":")))
+
+
+# --- 2. Trace ids ---
+def new_trace():
+    return uuid.uuid4().hex[:12]
+
+
+def set_current(trace_id):
+    """Marks the utterance that subsequent spans belong to"""
+    global _current_trace
+    _current_trace = trace_id
+
+
+def current():
+    return _current_trace
+
+
+# --- 3. Spans ---
+class Span:
+    def __init__(self, name, trace=None, **attrs):
+        self.name = name
+        self.trace = trace
+        self.attrs = attrs
+
+    def __enter__(self):
+        if self.trace is None:
+            self.trace = _current_trace
+        self.ts = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __exit__(self, exc_type, exc, tb):
+        record = {
+            "span": self.name,
+            "trace": self.trace,
+            "ts": round(self.ts, 6),
+            "dur_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "thread": threading.current_thread().name,
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.attrs:
+            record["attrs"] = self.attrs
+        emit(record)
+        return False
+
+
+def span(name, trace=None, **attrs):
+    """with tracing.span("stage"): ... records one timed span"""
+    return Span(name, trace, **attrs)
+
+
+def mark(name, trace=None, **attrs):
+    """Records an instantaneous event (a zero-length span)"""
+    record = {"span": name, "trace": trace or _current_trace, "ts": round(time.time(), 6),
+              "dur_ms": 0.0, "thread": threading.current_thread().name}
+    if attrs:
+        record["attrs"] = attrs
+    emit(record)
+
+
+def traced(name):
+    """Decorator form of span()"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- 4. Summary tool ---
+END_OF_SPEECH = "speech.capture"
+FIRST_AUDIO = "tts.first_audio"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def load(paths):
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        pass
+    return records
+
+
+def summarize(records):
+    """Returns {stage: [durations_ms]} including the end-to-end 'e2e.speech_to_audio' stage"""
+    stages = {}
+    speech_end = {}
+    first_audio = {}
+    for r in records:
+        # Instant marks (events, metric counters) have no duration to rank
+        if r["dur_ms"] > 0:
+            stages.setdefault(r["span"], []).append(r["dur_ms"])
+        trace = r.get("trace")
+        if not trace:
+            continue
+        if r["span"] == END_OF_SPEECH:
+            speech_end[trace] = r["ts"] + r["dur_ms"] / 1000
+        elif r["span"] == FIRST_AUDIO:
+            first_audio[trace] = min(first_audio.get(trace, r["ts"]), r["ts"])
+    e2e = [(first_audio[t] - speech_end[t]) * 1000 for t in first_audio if t in speech_end]
+    if e2e:
+        stages["e2e.speech_to_audio"] = e2e
+    return stages
+
+
+def print_summary(stages):
+    print(f"{'stage':<28}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name in sorted(stages):
+        values = stages[name]
+        print(f"{name:<28}{len(stages[name]):>7}"
+              f"{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}{percentile(values, 99):>10.1f}")
+
+
+def main(argv):
+    if not argv or argv[0] != "summary":
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 1
+    paths = argv[1:] or sorted(glob.glob(config.TRACE_PATH + "*"))
+    if not paths:
+        print(f"No trace files found at {config.TRACE_PATH}")
+        return 1
+    print_summary(summarize(load(paths)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
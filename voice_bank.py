@@ -0,0 +1,322 @@
+# voice_bank.py
+"""
+Packed voice bank: cached phrases as pre-decoded PCM in one file.
+
+Layout: a fixed header, the clips (mono 16-bit PCM) back to back, then a
+JSON index of {phrase key: [offset, length]}. Appends write the new clips
+after the current index, then a fresh index, and rewrite the header last,
+so a crash mid-append leaves the previous bank readable. Superseded
+indexes are dead space until the next compaction.
+
+The bank is memory-mapped, so a cached phrase reaches the audio device as a
+slice of the mapping: no file open, no MP3 decode, no player subprocess.
+Playback needs sounddevice; decoding needs ffmpeg or afconvert. Without
+them Blaze keeps playing the loose MP3s in voice_cache/.
+
+    python voice_bank.py compact [cache_dir]
+"""
+import os
+import sys
+import json
+import mmap
+import wave
+import queue
+import shutil
+import struct
+import tempfile
+import functools
+import threading
+import subprocess
+import contextlib
+
+import config
+import metrics
+
+# Optional dependency for zero-copy playback
+try:
+    import sounddevice
+except ImportError:
+    sounddevice = None
+
+# POSIX only; elsewhere writers are not serialised across processes
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAGIC = b"BLZVBNK1"
+# magic, sample rate, channels, sample width, index offset, index length
+HEADER = struct.Struct("<8sIHHQQ")
+
+
+def key_for(path):
+    """Bank key of a cache file: its name without the extension (the phrase hash)"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+# --- 1. Decoding ---
+@functools.lru_cache(maxsize=None)
+def decoder():
+    return shutil.which("ffmpeg") or shutil.which("afconvert")
+
+
+def decode(mp3_path, sample_rate):
+    """Mono 16-bit PCM for an MP3, or None if it cannot be decoded"""
+    tool = decoder()
+    if tool is None:
+        return None
+    if os.path.basename(tool) == "ffmpeg":
+        result = subprocess.run([tool, "-v", "error", "-i", mp3_path, "-f", "s16le",
+                                 "-ac", "1", "-ar", str(sample_rate), "-"], capture_output=True)
+        return result.stdout if result.returncode == 0 and result.stdout else None
+    fd, wav_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        result = subprocess.run([tool, "-f", "WAVE", "-d", f"LEI16@{sample_rate}", "-c", "1",
+                                 mp3_path, wav_path], capture_output=True)
+        if result.returncode != 0:
+            return None
+        with wave.open(wav_path, "rb") as w:
+            return w.readframes(w.getnframes())
+    finally:
+        os.remove(wav_path)
+
+
+# --- 2. File format ---
+def _read_index(f):
+    """(sample_rate, index) from an open bank file, or None if it is not a bank"""
+    f.seek(0)
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    magic, sample_rate, channels, width, index_offset, index_length = HEADER.unpack(header)
+    if magic != MAGIC:
+        return None
+    f.seek(index_offset)
+    try:
+        return sample_rate, json.loads(f.read(index_length))
+    except ValueError:
+        return None
+
+
+@contextlib.contextmanager
+def _write_lock(path):
+    """Exclusive lock held by every writer of the bank (appends and compaction)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".lock", "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def _commit(f, sample_rate, index):
+    """Writes the index at the end of the file, then points the header at it"""
+    f.seek(0, os.SEEK_END)
+    index_offset = f.tell()
+    blob = json.dumps(index, separators=(",", ":")).encode()
+    f.write(blob)
+    f.flush()
+    os.fsync(f.fileno())
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, sample_rate, 1, 2, index_offset, len(blob)))
+    f.flush()
+
+
+# --- 3. Bank ---
+class _StreamPlayer:
+    """An open output stream plus the clip to write to it; wait() mirrors Popen.wait()"""
+    def __init__(self, stream, clip):
+        self.stream = stream
+        self.clip = clip
+
+    def wait(self):
+        try:
+            self.stream.write(self.clip)
+        finally:
+            self.stream.stop()
+            self.stream.close()
+        metrics.incr("voice_bank.playbacks")
+
+
+class VoiceBank:
+    def __init__(self, path=None, sample_rate=None):
+        self.path = path or config.VOICE_BANK_PATH
+        self.sample_rate = sample_rate or config.VOICE_BANK_SAMPLE_RATE
+        self.index = {}
+        self._map = None
+        self._lock = threading.Lock()
+        self._pending = queue.SimpleQueue()
+        self._writer = None
+        self.load()
+
+    def load(self):
+        """(Re)maps the bank file. Views handed out earlier keep the old mapping alive."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                found = _read_index(f)
+                if found is None:
+                    print(f"Voice bank {self.path} is not a bank file, ignoring it")
+                    return
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as e:
+            print(f"Voice bank unreadable: {e}")
+            return
+        with self._lock:
+            self.sample_rate, self.index = found
+            self._map = mapping
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, key):
+        """Zero-copy view of a clip's PCM, or None"""
+        with self._lock:
+            entry = self.index.get(key)
+            mapping = self._map
+        if entry is None:
+            return None
+        offset, length = entry
+        return memoryview(mapping)[offset:offset + length]
+
+    def start(self, key):
+        """
+        Opens an audio stream for a banked clip and returns a player whose
+        wait() plays it from the mapping. None if it is not banked or there is
+        no player.
+        """
+        if sounddevice is None or not config.VOICE_BANK_ENABLED:
+            return None
+        clip = self.get(key)
+        if clip is None:
+            return None
+        stream = sounddevice.RawOutputStream(samplerate=self.sample_rate, channels=1, dtype="int16")
+        stream.start()
+        return _StreamPlayer(stream, clip)
+
+    def append(self, clips):
+        """
+        Appends {key: pcm} and commits. Holds the bank's write lock and re-reads
+        the on-disk index, so appends from other processes and compactions are
+        not lost.
+        """
+        with _write_lock(self.path):
+            mode = "r+b" if os.path.exists(self.path) else "w+b"
+            with open(self.path, mode) as f:
+                found = _read_index(f)
+                if found is None:
+                    f.truncate(0)
+                    f.write(HEADER.pack(MAGIC, self.sample_rate, 1, 2, 0, 0))
+                    found = (self.sample_rate, {})
+                sample_rate, index = found
+                f.seek(0, os.SEEK_END)
+                for key, pcm in clips.items():
+                    index[key] = [f.tell(), len(pcm)]
+                    f.write(pcm)
+                _commit(f, sample_rate, index)
+        self.load()
+
+    # --- Background updates ---
+    def add_file(self, mp3_path):
+        """Queues a freshly synthesised phrase to be decoded into the bank"""
+        if not config.VOICE_BANK_ENABLED or key_for(mp3_path) in self.index or decoder() is None:
+            return
+        self._pending.put(mp3_path)
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="blaze-voice-bank", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            while True:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            clips = {}
+            for path in batch:
+                key = key_for(path)
+                if key in self.index or key in clips:
+                    continue
+                pcm = decode(path, self.sample_rate)
+                if pcm is None:
+                    metrics.incr("voice_bank.decode_failures")
+                    continue
+                clips[key] = pcm
+            if clips:
+                try:
+                    self.append(clips)
+                    metrics.incr("voice_bank.clips_added", len(clips))
+                except OSError as e:
+                    print(f"Voice bank write error: {e}")
+
+
+def compact(cache_dir, path=None):
+    """
+    Rebuilds the bank without dead space: every clip already banked plus every
+    loose MP3 in cache_dir that is not. Returns (kept, added). Appends wait on
+    the write lock until the new file is in place.
+    """
+    path = path or config.VOICE_BANK_PATH
+    with _write_lock(path):
+        old = VoiceBank(path)
+        sample_rate = old.sample_rate
+        tmp = path + ".tmp"
+        index = {}
+        with open(tmp, "w+b") as f:
+            f.write(HEADER.pack(MAGIC, sample_rate, 1, 2, 0, 0))
+            for key in sorted(old.index):
+                clip = old.get(key)
+                index[key] = [f.tell(), len(clip)]
+                f.write(clip)
+            kept = len(index)
+            for name in sorted(os.listdir(cache_dir)):
+                if not name.endswith(".mp3") or key_for(name) in index:
+                    continue
+                pcm = decode(os.path.join(cache_dir, name), sample_rate)
+                if pcm is None:
+                    print(f"Could not decode {name}, skipping")
+                    continue
+                index[key_for(name)] = [f.tell(), len(pcm)]
+                f.write(pcm)
+            _commit(f, sample_rate, index)
+        os.replace(tmp, path)
+    return kept, len(index) - kept
+
+
+_bank = None
+
+
+def get_bank():
+    global _bank
+    if _bank is None:
+        _bank = VoiceBank()
+    return _bank
+
+
+def main(argv):
+    if not argv or argv[0] != "compact":
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 1
+    if decoder() is None:
+        print("ffmpeg or afconvert is needed to decode the voice cache")
+        return 1
+    cache_dir = argv[1] if len(argv) > 1 else os.path.dirname(config.VOICE_BANK_PATH) or "."
+    kept, added = compact(cache_dir)
+    size = os.path.getsize(config.VOICE_BANK_PATH)
+    print(f"{config.VOICE_BANK_PATH}: {kept} kept, {added} added, {size / 1e6:.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
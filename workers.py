@@ -0,0 +1,266 @@
+# workers.py
+"""
+Multi-process mode (config.MULTIPROCESS_MODE).
+
+Face auth runs in one worker process, which stays up after a successful
+scan to run the presence checks with its warm model; audio capture and speech recognition
+run in two more, so camera reads, LBPH prediction and recognition never
+compete with Qt painting for the GUI process's GIL. Bulk data does not go
+through pickled queues: camera previews and captured audio are written into
+shared-memory ring buffers, and the queues only carry slot numbers and
+results. The GUI side of each pipeline is polled from a QThread in
+blaze_pyqt_main.
+"""
+import time
+import queue
+import multiprocessing
+
+import speech_recognition as sr
+
+import config
+import tracing
+import presence
+import performance
+import face_auth
+import speech_engine as io
+from shm_ring import ShmRing
+
+
+# --- 1. Worker processes ---
+class _WorkerSignals:
+    """face_auth's signals interface, reporting to the GUI process instead of Qt"""
+    def __init__(self, events, frames):
+        self.events = events
+        self.frames = frames
+
+    def update_status(self, text):
+        self.events.put(("status", text))
+
+    def update_progress(self, text):
+        self.events.put(("progress", text))
+
+    def update_camera_frame(self, frame):
+        rgb_image = face_auth.preview_rgb(frame)
+        h, w = rgb_image.shape[:2]
+        written = self.frames.write(rgb_image)
+        if written:
+            self.events.put(("frame", *written, w, h))
+
+    def speak(self, text):
+        # TTS playback stays in the GUI process, next to echo suppression
+        self.events.put(("speak", text))
+
+
+def _face_worker(frame_ring, events, stopping, profile, scan):
+    """Scans (unless the presence window made it unnecessary), then runs presence checks until stopped"""
+    tracing.forward_to(events)
+    performance.apply(profile)
+    frames = ShmRing.attach(frame_ring)
+    signals = _WorkerSignals(events, frames)
+    try:
+        verified = True
+        if scan:
+            verified = face_auth.authenticate(signals, signals.speak)
+            events.put(("result", verified))
+        if verified and config.PRESENCE_ENABLED:
+            state = presence.get_state()
+            if scan:
+                # Open the window here too: this process's copy of the state file predates the scan
+                state.verified()
+            presence.PresenceMonitor(state, stop=stopping).run()
+    except Exception as e:
+        events.put(("error", str(e)))
+    finally:
+        frames.close()
+
+
+def _capture_worker(audio_ring, utterances, control, listening, events, profile):
+    """
+    Records utterances into the audio ring while the GUI process allows listening.
+    Control messages: ("profile", name), ("note",) to dictate the next utterance, None to stop.
+    """
+    tracing.forward_to(events)
+    performance.apply(profile)
+    audio = ShmRing.attach(audio_ring)
+    io.calibrate()
+    note_pending = False
+    try:
+        while True:
+            try:
+                message = control.get_nowait()
+            except queue.Empty:
+                message = ()
+            if message is None:
+                break
+            if message and message[0] == "profile":
+                performance.apply(message[1])
+            elif message and message[0] == "note":
+                note_pending = True
+            if not listening.wait(0.2):
+                continue
+            # Only a capture started after the request is the note, never one already in flight
+            purpose = "note" if note_pending else "heard"
+            note_pending = False
+            trace = tracing.new_trace()
+            try:
+                with io.mic as source:
+                    capture_start = time.time()
+                    with tracing.span("speech.capture", trace=trace):
+                        clip = io.recognizer.listen(source, timeout=performance.get("listen_timeout"),
+                                                    phrase_time_limit=performance.get("phrase_time_limit"))
+                    capture_end = time.time()
+            except sr.WaitTimeoutError:
+                if purpose == "note":
+                    events.put(("note", None))
+                continue
+            except Exception as e:
+                if purpose == "note":
+                    events.put(("note", None))
+                events.put(("error", str(e)))
+                time.sleep(1)
+                continue
+            written = audio.write(clip.frame_data)
+            if written is None:
+                if purpose == "note":
+                    events.put(("note", None))
+                events.put(("dropped", "too_large"))
+                continue
+            utterances.put((*written, len(clip.frame_data), clip.sample_rate, clip.sample_width,
+                            trace, capture_start, capture_end, purpose))
+    finally:
+        utterances.put(None)
+        audio.close()
+
+
+def _recognize_worker(audio_ring, utterances, events):
+    """Turns captured utterances into text, reported as "heard" or "note" events"""
+    tracing.forward_to(events)
+    audio = ShmRing.attach(audio_ring)
+    recognizer = sr.Recognizer()
+    try:
+        for slot, seq, size, rate, width, trace, capture_start, capture_end, purpose in iter(utterances.get, None):
+            data = audio.read(slot, seq, size)
+            command = None
+            if data is None:
+                events.put(("dropped", "overwritten"))
+            else:
+                try:
+                    with tracing.span("speech.recognize", trace=trace):
+                        command = recognizer.recognize_google(sr.AudioData(data, rate, width))
+                except (sr.UnknownValueError, sr.RequestError):
+                    pass
+                except Exception as e:
+                    events.put(("error", str(e)))
+            if command is not None:
+                events.put((purpose, command, trace, capture_start, capture_end))
+            elif purpose == "note":
+                # The GUI is waiting for the dictation; tell it nothing was caught
+                events.put(("note", None))
+    finally:
+        audio.close()
+
+
+# --- 2. GUI-process side ---
+class _Pipeline:
+    """Worker processes plus the event queue they report on"""
+    def __init__(self):
+        # spawn everywhere: forking a process that runs Qt threads is unsafe
+        self.ctx = multiprocessing.get_context("spawn")
+        self.events = self.ctx.Queue()
+        self.processes = []
+        self.rings = []
+
+    def _spawn(self, target, *args):
+        process = self.ctx.Process(target=target, args=args, daemon=True)
+        process.start()
+        self.processes.append(process)
+
+    def alive(self):
+        return any(process.is_alive() for process in self.processes)
+
+    def poll(self, timeout=0.05):
+        """Events received since the last call. Worker trace records are written here, not returned."""
+        received = []
+        try:
+            received.append(self.events.get(timeout=timeout))
+            while True:
+                received.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        events = []
+        for event in received:
+            if event[0] == "trace":
+                tracing.emit(event[1])
+            else:
+                events.append(event)
+        return events
+
+    def stop(self, timeout=0.5):
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for ring in self.rings:
+            ring.close(unlink=True)
+        self.rings = []
+
+
+class FacePipeline(_Pipeline):
+    """
+    Events: status, progress, speak, frame (slot, seq, w, h), result (bool), error.
+    After a successful scan the worker runs presence checks until stop().
+    """
+    def __init__(self):
+        super().__init__()
+        self.stopping = self.ctx.Event()
+
+    def start(self, profile, scan=True):
+        self.frames = ShmRing(config.MULTIPROCESS_RING_SLOTS, config.MULTIPROCESS_FRAME_SLOT_BYTES)
+        self.rings.append(self.frames)
+        self._spawn(_face_worker, self.frames.spec(), self.events, self.stopping, profile, scan)
+
+    def poll(self, timeout=0.05):
+        """As _Pipeline.poll, keeping only the newest preview frame"""
+        events = super().poll(timeout)
+        frames = [i for i, event in enumerate(events) if event[0] == "frame"]
+        return [event for i, event in enumerate(events) if event[0] != "frame" or i == frames[-1]]
+
+    def stop(self, timeout=0.5):
+        self.stopping.set()
+        super().stop(timeout)
+
+
+class VoicePipeline(_Pipeline):
+    """
+    Events: heard (command, trace, capture_start, capture_end), note (the same,
+    or None if nothing was caught), dropped, error
+    """
+    def __init__(self):
+        super().__init__()
+        self.control = self.ctx.Queue()
+        self.listening = self.ctx.Event()
+
+    def start(self, profile):
+        self.audio = ShmRing(config.MULTIPROCESS_RING_SLOTS, config.MULTIPROCESS_AUDIO_SLOT_BYTES)
+        self.rings.append(self.audio)
+        utterances = self.ctx.Queue()
+        self._spawn(_capture_worker, self.audio.spec(), utterances, self.control,
+                    self.listening, self.events, profile)
+        self._spawn(_recognize_worker, self.audio.spec(), utterances, self.events)
+
+    def set_listening(self, allowed):
+        if allowed:
+            self.listening.set()
+        else:
+            self.listening.clear()
+
+    def set_profile(self, name):
+        self.control.put(("profile", name))
+
+    def request_note(self):
+        """The next utterance is dictation: it comes back as a "note" event"""
+        self.control.put(("note",))
+
+    def stop(self, timeout=0.5):
+        self.control.put(None)
+        super().stop(timeout)